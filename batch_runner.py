@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 19:12:37 2026
+
+Command line batch runner for parcel inventories. The parcel table (CSV or
+Parquet) is read in chunks, every chunk is evaluated with Surface.batch()
+(one call per element type and location) and its results are appended to
+the output file, so memory does not grow with the size of the inventory.
+
+Input columns:
+  id        : parcel identifier
+  element   : name of the Surface method, e.g. roof or gravel_cover
+  area      : area (m2)
+  measure   : (optional) id of the measure the parcel is connected to
+  location  : (optional) city name in climate.py, otherwise --p / --etp
+  further columns are parameters of the methods (e.g. sp, h, kf), empty
+  values take the defaults of the method
+
+Measures are defined in a JSON file mapping their id to the method and its
+parameters, e.g. {"M1": {"method": "infilt_swale", "kf": 42}}; "location"
+is optional. Runoff and connected area of the parcels are accumulated over
+all chunks and the measures are added at the end of the output. As in
+watbal(), connected parcels are written with Va = 0, their runoff is part
+of the inflow of the measure.
+
+Example:
+  python batch_runner.py parcels.csv results.csv --measures measures.json
+"""
+
+import argparse
+import inspect
+import json
+import os
+import sys
+import numpy as np
+import pandas as pd
+from dwa_a102 import StudyArea
+from network import call_measure
+from results import COLUMNS
+
+# columns of the output
+OUTPUT = ['id'] + COLUMNS + ['measure']
+
+
+def read_chunks(path, chunksize):
+    ''' yields the rows of a CSV or Parquet file as DataFrames '''
+    if path.endswith('.parquet'):
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, chunksize=chunksize)
+
+
+class ResultWriter(object):
+    '''
+    Appends results to a CSV or Parquet file (one row group per chunk)
+    '''
+
+    def __init__(self, path):
+        self.path = path
+        self.parquet = path.endswith('.parquet')
+        self.writer = None
+        self.rows = 0
+
+    def write(self, results):
+        results = results[OUTPUT].astype({'id': str, 'measure': str,
+                                          'Element': str})
+        if self.parquet:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            table = pa.Table.from_pandas(results, preserve_index=False)
+            if self.writer is None:
+                self.writer = pq.ParquetWriter(self.path, table.schema)
+            self.writer.write_table(table.cast(self.writer.schema))
+        else:
+            results.to_csv(self.path, mode='a' if self.rows else 'w',
+                           header=not self.rows, index=False)
+        self.rows += len(results)
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+
+def _defaults(element):
+    # parameters of a Surface method and their defaults (None if required)
+    signature = inspect.signature(getattr(StudyArea, element))
+    return {name: (None if param.default is inspect.Parameter.empty
+                   else param.default)
+            for name, param in signature.parameters.items()
+            if name not in ('self', 'area')}
+
+
+def run_chunk(chunk, study_areas, policy='raise'):
+    '''
+    Calculates the results of the parcels in a chunk
+
+    Parameters
+    ----------
+    chunk : DataFrame
+           parcels (see the columns above)
+
+    study_areas : callable
+                 returns the StudyArea of a location (None for the default)
+
+    policy : string, optional
+            handling of invalid parameters, see Surface.batch(). The default
+            is 'raise'.
+
+    Returns
+    -------
+    results : DataFrame
+             one row per valid parcel (columns as in OUTPUT)
+    '''
+    if 'measure' not in chunk:
+        chunk = chunk.assign(measure=np.nan)
+    if 'location' not in chunk:
+        chunk = chunk.assign(location=np.nan)
+
+    output = []
+    for (element, location), group in chunk.groupby(['element', 'location'],
+                                                    dropna=False, sort=False):
+        params = {}
+        for name, default in _defaults(element).items():
+            if name not in group:
+                continue
+            values = group[name].to_numpy(dtype=float)
+            missing = np.isnan(values)
+            if missing.all():
+                continue
+            if missing.any():
+                if default is None:
+                    raise Exception(f"{name} is missing for {element}"
+                                    f" (id {group['id'][missing].iloc[0]})")
+                values = np.where(missing, default, values)
+            params[name] = values
+
+        study_area = study_areas(None if pd.isna(location) else location)
+        results = study_area.batch(element, group['area'].to_numpy(float),
+                                   policy=policy, **params)
+        rows = results.index.to_numpy()
+        results = results.reset_index(drop=True)
+        results.insert(0, 'id', group['id'].to_numpy()[rows])
+        results['measure'] = group['measure'].to_numpy()[rows]
+        output.append(results)
+    return pd.concat(output, ignore_index=True)
+
+
+def run(inventory, output, measures=None, p=800, etp=500, p_corr_factor=1.0,
+        chunksize=50000, policy='raise'):
+    '''
+    Evaluates a parcel inventory chunk by chunk and writes the results
+
+    Parameters
+    ----------
+    inventory : string
+               parcel table (.csv or .parquet)
+
+    output : string
+            results file (.csv or .parquet)
+
+    measures : dict, optional
+              measure id -> dict with method and parameters. The default is
+              None.
+
+    p, etp, p_corr_factor : float, optional
+                           climate of parcels without location. The defaults
+                           are 800, 500 and 1.0.
+
+    chunksize : int, optional
+               number of parcels read at once. The default is 50000.
+
+    policy : string, optional
+            handling of invalid parameters, see Surface.batch(). The default
+            is 'raise'.
+
+    Returns
+    -------
+    rows : int
+          number of rows written
+    '''
+    measures = measures or {}
+    cache = {}
+
+    def study_areas(location):
+        if location not in cache:
+            cache[location] = StudyArea(p, etp, location=location,
+                                        p_corr_factor=p_corr_factor)
+        return cache[location]
+
+    connected = {m: [0.0, 0.0] for m in measures}
+    writer = ResultWriter(output)
+    try:
+        for chunk in read_chunks(inventory, chunksize):
+            results = run_chunk(chunk, study_areas, policy)
+            linked = results['measure'].notna()
+            unknown = set(results['measure'][linked]) - set(connected)
+            if unknown:
+                raise Exception("Measures not defined: "
+                                + ', '.join(map(str, sorted(unknown, key=str))))
+            sums = results[linked].groupby('measure')[['Au', 'Va']].sum()
+            for m, (au, va) in sums.iterrows():
+                connected[m][0] += au
+                connected[m][1] += va
+            # runoff of connected parcels is passed on to the measure
+            results.loc[linked, 'Va'] = 0
+            writer.write(results)
+
+        rows = []
+        for m, spec in measures.items():
+            study_area = StudyArea(p, etp, location=spec.get('location'),
+                                   p_corr_factor=p_corr_factor,
+                                   as_frame=False)
+            params = {k: x for k, x in spec.items()
+                      if k not in ('method', 'location')}
+            row = call_measure(study_area, spec['method'], params,
+                               *connected[m])._asdict()
+            row.update({'id': m, 'measure': ''})
+            rows.append(row)
+        if rows:
+            writer.write(pd.DataFrame(rows))
+    except BaseException:
+        # no partial results of a failed run
+        writer.close()
+        if os.path.exists(output):
+            os.remove(output)
+        raise
+    writer.close()
+    return writer.rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Water balance of a parcel inventory (DWA-A102)')
+    parser.add_argument('inventory', help='parcel table (.csv or .parquet)')
+    parser.add_argument('output', help='results file (.csv or .parquet)')
+    parser.add_argument('--measures', help='JSON file defining the measures')
+    parser.add_argument('--p', type=float, default=800,
+                        help='precipitation (mm/a), default 800')
+    parser.add_argument('--etp', type=float, default=500,
+                        help='potential evapotranspiration (mm/a), default 500')
+    parser.add_argument('--p-corr-factor', type=float, default=1.0,
+                        help='correction factor of precipitation, default 1')
+    parser.add_argument('--chunksize', type=int, default=50000,
+                        help='parcels per chunk, default 50000')
+    parser.add_argument('--policy', choices=('raise', 'drop', 'clip'),
+                        default='raise',
+                        help='handling of invalid parameters, default raise')
+    args = parser.parse_args(argv)
+
+    measures = None
+    if args.measures:
+        with open(args.measures) as f:
+            measures = json.load(f)
+    rows = run(args.inventory, args.output, measures, args.p, args.etp,
+               args.p_corr_factor, args.chunksize, args.policy)
+    print(f'{rows} rows written to {args.output}', file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
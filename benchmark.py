@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 20:03:52 2026
+
+Benchmarks with fixed synthetic workloads: all Surface methods, all Measure
+methods with 1, 10 and 1000 connected surfaces, watbal() with a growing
+number of inputs, bagrov() for several n and natural_wb_guess(). Results
+are printed and appended as JSON lines (one record per benchmark, with
+timestamp and git commit) to track the performance over time, by default
+to benchmarks/results.jsonl in the repository (not under version control).
+
+Example:
+  python benchmark.py --filter measure
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import time
+import timeit
+import numpy as np
+import pandas as pd
+from dwa_a102 import StudyArea, watbal
+from simple_bagluva import bagrov, bagrov_cache_clear
+
+# default file of the records
+OUTPUT = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                      'benchmarks', 'results.jsonl')
+
+# parameters of the surfaces
+SURFACES = {
+    'garden': dict(area=1000),
+    'roof': dict(area=1000, sp=0.3),
+    'flat_area': dict(area=1000, sp=1.5),
+    'green_roof': dict(area=1000, h=100, fg=1.2, AWC=0.5),
+    'green_roof_shallow': dict(area=1000),
+    'storage_roof': dict(area=1000, sp=5),
+    'permeable_surface': dict(area=1000, fa=8, kf=50, sp=1, wkmax_wp=0.15),
+    'porous_surface': dict(area=1000, sp=3.5, h=100, kf=100),
+    'paver_stonegrid': dict(area=1000, fa=25, sp=1, wkmax_wp=0.15),
+    'gravel_cover': dict(area=1000, h=100, sp=3.5, kf=1.8),
+    }
+
+# positional parameters of the measures (before the connected surfaces)
+MEASURES = {
+    'drainage': ('pipe',),
+    'surf_infiltration': (500,),
+    'infilt_swale': (42,),
+    'swale_trench': (10,),
+    'swale_trench_system': (5, 1),
+    'rainwater_usage': (50, 1, 2, 60),
+    'pond_system': (100,),
+    }
+
+CONNECTED = (1, 10, 1000)
+WATBAL_INPUTS = (1, 10, 100, 1000)
+BAGROV_N = (0.5, 1, 2, 5, 10)
+
+
+def git_commit():
+    ''' hash of the current commit, None outside of a git repository '''
+    repository = os.path.dirname(os.path.abspath(__file__))
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=repository,
+                              capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def measure_time(f, repeat=5, min_time=0.2):
+    '''
+    Best time of one call of f (s), taken from repeat runs of as many calls
+    as needed to last min_time
+    '''
+    number = 1
+    timer = timeit.Timer(f)
+    while timer.timeit(number) < min_time and number < 1e6:
+        number *= 10
+    return min(timer.repeat(repeat, number))/number, number
+
+
+def workloads():
+    ''' yields name, parameters and function of every benchmark '''
+    study_area = StudyArea(700, 575)
+
+    for method, params in SURFACES.items():
+        f = getattr(study_area, method)
+        yield f'surface.{method}', {}, (lambda f=f, p=params: f(**p))
+
+    roof = study_area.roof(1000, 0.3)
+    for method, args in MEASURES.items():
+        f = getattr(study_area, method)
+        for n in CONNECTED:
+            surfaces = [roof]*n
+            yield (f'measure.{method}', {'surfaces': n},
+                   (lambda f=f, a=args, s=surfaces: f(*a, *s)))
+
+    garden = study_area.garden(1000)
+    for n in WATBAL_INPUTS:
+        inputs = [garden]*(n - 1) + [study_area.infilt_swale(42, roof)]
+        yield ('watbal', {'inputs': n}, (lambda i=inputs: watbal(*i)))
+
+    for n in BAGROV_N:
+        yield 'bagrov', {'n': n}, (lambda n=n: bagrov(n))
+
+    def guess(clear):
+        # a cleared cache recomputes the Bagrov curve on every call
+        if clear:
+            bagrov_cache_clear()
+        return study_area.natural_wb_guess(5, 2, 1, 2, 'open')
+
+    yield 'natural_wb_guess', {'cache': 'cold'}, lambda: guess(True)
+    yield 'natural_wb_guess', {'cache': 'warm'}, lambda: guess(False)
+
+
+def run(output=None, pattern=None, repeat=5, min_time=0.2):
+    '''
+    Runs the benchmarks and appends their records to output (JSON lines)
+
+    Parameters
+    ----------
+    output : string, optional
+            file the records are appended to. The default is None (no
+            file).
+
+    pattern : string, optional
+             only benchmarks containing pattern in their name are run. The
+             default is None (all).
+
+    repeat : int, optional
+            number of timing runs, the best one is recorded. The default
+            is 5.
+
+    min_time : float, optional
+              minimum duration of a timing run (s). The default is 0.2.
+
+    Returns
+    -------
+    records : list of dict
+    '''
+    info = {'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'commit': git_commit(), 'python': platform.python_version(),
+            'numpy': np.__version__, 'pandas': pd.__version__}
+    records = []
+    for name, params, f in workloads():
+        if pattern and pattern not in name:
+            continue
+        best, number = measure_time(f, repeat, min_time)
+        record = dict(info, name=name, params=params, seconds=best,
+                      number=number)
+        records.append(record)
+        label = ', '.join(f'{k}={v}' for k, v in params.items())
+        print(f'{name:<32} {label:<16} {best*1e6:12.1f} us')
+
+    if output:
+        os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+        with open(output, 'a') as f:
+            for record in records:
+                f.write(json.dumps(record) + '\n')
+    return records
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmarks of DWA-A102')
+    parser.add_argument('--output', default=OUTPUT,
+                        help='JSON lines file the results are appended to,'
+                        ' default benchmarks/results.jsonl')
+    parser.add_argument('--filter', dest='pattern',
+                        help='run only benchmarks containing this text')
+    parser.add_argument('--repeat', type=int, default=5,
+                        help='number of timing runs, default 5')
+    parser.add_argument('--min-time', type=float, default=0.2,
+                        help='minimum duration of a timing run (s)')
+    args = parser.parse_args(argv)
+    run(args.output, args.pattern, args.repeat, args.min_time)
+
+
+if __name__ == '__main__':
+    main()
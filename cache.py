@@ -0,0 +1,244 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 22:38:50 2026
+
+Persistent cache of the results of surfaces and measures in a SQLite file.
+Results are stored by (model version, P, ETP, method, parameters), and for
+measures additionally by the connected area and runoff, so repeated runs
+only compute elements that changed. The least recently used results are
+removed when the cache exceeds its size.
+
+Example:
+  with ResultCache('results.sqlite') as cache:
+      net = Network(StudyArea(700, 575), cache=cache)
+      ...
+      print(cache.stats())
+"""
+
+import hashlib
+import inspect
+import json
+import numbers
+import sqlite3
+import numpy as np
+from dwa_a102 import SURFACE_ELEMENTS, StudyArea
+from network import call_measure
+from regressions import MODEL_VERSION
+from results import ElementResult
+
+# number of writes after which changes are committed to the file
+COMMIT_INTERVAL = 1000
+
+
+def _normalize(value):
+    # numbers (also numpy scalars) as float, so that 500, 500.0 and
+    # np.int64(500) give the same key
+    if isinstance(value, (bool, np.bool_)) or \
+            not isinstance(value, numbers.Real):
+        return value
+    return float(value)
+
+
+class ResultCache(object):
+    '''
+    Results of surfaces and measures (ElementResult) stored in SQLite
+
+    Parameters
+    ----------
+    path : string, optional
+          file of the cache. The default is ':memory:' (not persistent).
+
+    max_entries : int, optional
+                 maximum number of stored results, the least recently used
+                 results are removed beyond. The default is 1000000.
+
+    Notes
+    ------
+    A cache can be passed to other processes (e.g. with networks in
+    evaluate_parallel()) after commit(): each process opens the file again
+    and commits every result it stores, statistics are counted per process. A cache
+    in memory starts empty in every process.
+    '''
+
+    def __init__(self, path=':memory:', max_entries=1000000):
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._writes = 0
+        self._interval = COMMIT_INTERVAL
+        # key -> time of use of results read since the last commit
+        self._used = {}
+        self._connect()
+
+    def _connect(self):
+        self.db = sqlite3.connect(self.path, timeout=60)
+        self.db.execute('CREATE TABLE IF NOT EXISTS results'
+                        ' (key TEXT PRIMARY KEY, value TEXT, used INTEGER)')
+        self.db.execute('CREATE INDEX IF NOT EXISTS results_used'
+                        ' ON results (used)')
+        self._clock, self._entries = self.db.execute(
+            'SELECT COALESCE(MAX(used), 0), COUNT(*) FROM results').fetchone()
+
+    def __len__(self):
+        return self._entries
+
+    def __repr__(self):
+        return f"ResultCache({self.path!r}, {self._entries} results)"
+
+    def __getstate__(self):
+        # the connection cannot be pickled, it is opened again by path
+        # (changes not committed yet are not seen by the other process)
+        state = self.__dict__.copy()
+        del state['db']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.hits = self.misses = 0
+        self._used = {}
+        # other processes may write to the same file
+        self._interval = 1
+        self._connect()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @staticmethod
+    def key(p, etp, method, params):
+        '''
+        Key of a result: SHA-256 of model version, climate, method and
+        parameters (defaults of the method filled in, numbers as float,
+        independent of the order). Au and Va of measures are taken as given.
+        '''
+        params = dict(params)
+        connected = {k: params.pop(k) for k in ('Au', 'Va') if k in params}
+        signature = inspect.signature(getattr(StudyArea, method))
+        bound = signature.bind_partial(None, **params)
+        bound.apply_defaults()
+        params = {name: value for name, value in bound.arguments.items()
+                  if signature.parameters[name].kind
+                  in (inspect.Parameter.POSITIONAL_OR_KEYWORD,
+                      inspect.Parameter.KEYWORD_ONLY)}
+        del params['self']
+        params.update(connected)
+        text = json.dumps([MODEL_VERSION, float(p), float(etp), method,
+                           {k: _normalize(v) for k, v in params.items()}],
+                          sort_keys=True, separators=(',', ':'))
+        return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        ''' stored result of a key (ElementResult), None if not stored '''
+        row = self.db.execute('SELECT value FROM results WHERE key = ?',
+                              (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._clock += 1
+        # times of use are written at the next commit
+        self._used[key] = self._clock
+        return ElementResult(*json.loads(row[0]))
+
+    def put(self, key, result):
+        ''' stores a result (ElementResult) of a key '''
+        self._clock += 1
+        value = json.dumps(list(result), default=float)
+        inserted = self.db.execute(
+            'INSERT OR IGNORE INTO results VALUES (?, ?, ?)',
+            (key, value, self._clock)).rowcount
+        if not inserted:
+            self.db.execute('UPDATE results SET value = ?, used = ?'
+                            ' WHERE key = ?', (value, self._clock, key))
+        self._used.pop(key, None)
+        self._written()
+        if inserted:
+            self._entries += 1
+            if self._entries > self.max_entries:
+                self.evict(self._entries - self.max_entries)
+
+    def evict(self, n):
+        ''' removes the n least recently used results '''
+        self._flush()
+        self.db.execute('DELETE FROM results WHERE key IN (SELECT key FROM'
+                        ' results ORDER BY used LIMIT ?)', (n,))
+        self._written()
+        self._entries = self.db.execute(
+            'SELECT COUNT(*) FROM results').fetchone()[0]
+
+    def _flush(self):
+        # writes the times of use of results read since the last commit
+        if self._used:
+            self.db.executemany('UPDATE results SET used = ? WHERE key = ?',
+                                [(used, key) for key, used
+                                 in self._used.items()])
+            self._used.clear()
+
+    def _written(self):
+        self._writes += 1
+        if self._writes % self._interval == 0:
+            self.commit()
+
+    def commit(self):
+        ''' writes pending changes to the file '''
+        self._flush()
+        self.db.commit()
+
+    def evaluate(self, study_area, method, params, au=0, va=0):
+        '''
+        Result of a surface or measure, taken from the cache or calculated
+        and stored
+
+        Parameters
+        ----------
+        study_area : StudyArea
+                    climate, with as_frame=False
+
+        method : string
+                name of the Surface or Measure method
+
+        params : dict
+                parameters of the method by name
+
+        au, va : float, optional
+                connected area and runoff of the surfaces connected to a
+                measure. The default is 0.
+
+        Returns
+        -------
+        result : ElementResult
+        '''
+        surface = method in SURFACE_ELEMENTS
+        key = self.key(study_area.p, study_area.etp, method,
+                       params if surface else dict(params, Au=au, Va=va))
+        result = self.get(key)
+        if result is None:
+            if surface:
+                result = getattr(study_area, method)(**params)
+            else:
+                result = call_measure(study_area, method, params, au, va)
+            self.put(key, result)
+        return result
+
+    def stats(self):
+        ''' hits, misses, hit rate and number of stored results '''
+        calls = self.hits + self.misses
+        return {'hits': self.hits, 'misses': self.misses,
+                'hit_rate': self.hits/calls if calls else 0.0,
+                'entries': self._entries}
+
+    def clear(self):
+        ''' removes all results and resets the statistics '''
+        self._used.clear()
+        self.db.execute('DELETE FROM results')
+        self.db.commit()
+        self._entries = 0
+        self.hits = self.misses = 0
+
+    def close(self):
+        ''' writes pending changes and closes the file '''
+        self.commit()
+        self.db.close()
@@ -5,6 +5,8 @@ Created on Fri Feb 19 10:12:05 2021
 @author: Edwin Echeverri Salazar
 """
 
+import numpy as np
+
 param_ranges = {
     'P': [500, 1700, 'Precipitation', 'mm/a'], 
     'ETp' :[450, 700, 'Evapotranspiration', 'mm/a'], 
@@ -40,9 +42,162 @@ param_ranges = {
 
 
 def validRange(val, param):
-    ''' generic function to check parameter range'''
+    ''' generic function to check parameter range (val may be an array)'''
     
-    if ( (val < param_ranges[param][0]) or (val > param_ranges[param][1]) ): 
+    if ( np.any(np.asarray(val) < param_ranges[param][0]) or
+         np.any(np.asarray(val) > param_ranges[param][1]) ): 
         raise Exception(f"{param_ranges[param][2]} is not valid."
                         f" Acceptable range: {param_ranges[param][0]} - {param_ranges[param][1]}"
-                        f" {param_ranges[param][3]}")
\ No newline at end of file
+                        f" {param_ranges[param][3]}")
+
+
+def range_key(param, method):
+    '''
+    key in param_ranges for a parameter of a method of StudyArea
+    (e.g. 'sp', 'roof' -> 'Sp_roof'), None if there is no range
+    '''
+    key = f'{param}_{method}'.lower()
+    for k in param_ranges:
+        if k.lower() == key:
+            return k
+    return None
+
+
+
+def validJointRatio(fa):
+    ''' joint ratio of permeable surfaces, equations exist for 2-5 and 6-10 % '''
+    
+    fa = np.asarray(fa)
+    if np.any(((fa < 2) | (fa > 5)) & ((fa < 6) | (fa > 10))):
+        raise Exception("Joint ratio (fa) is not valid."
+                        " Acceptable ranges: 2 - 5 or 6 - 10 %")
+
+
+def validParams(method, **params):
+    ''' checks all parameters of a method of StudyArea that have a range '''
+    
+    for param, val in params.items():
+        key = range_key(param, method)
+        if key is not None:
+            validRange(val, key)
+    if method == 'permeable_surface' and 'fa' in params:
+        validJointRatio(params['fa'])
+
+
+def _invalid(method, param, val):
+    # rows of val outside the range of validity of a parameter of a method
+    # (p and etp for all methods), its key in param_ranges and the acceptable
+    # range as text, None if the parameter has no range
+    key = {'p': 'P', 'etp': 'ETp'}.get(param) or range_key(param, method)
+    if key is None:
+        return None
+    low, high = param_ranges[key][0], param_ranges[key][1]
+    val = np.asarray(val, dtype=float)
+    # NaN (no data) is not valid
+    bad = ~((val >= low) & (val <= high))
+    if method == 'permeable_surface' and param == 'fa':
+        # no equation for joint ratios between 5 and 6 %
+        return bad | ((val > 5) & (val < 6)), key, '2 - 5 or 6 - 10'
+    return bad, key, f'{low} - {high}'
+
+
+def validMask(method, **params):
+    '''
+    Same checks as validBatch(), but only the mask of valid values (in the
+    shape the parameters broadcast to), e.g. for samples or grids
+
+    Parameters
+    ----------
+    method : string
+            name of the method, None to check only p and etp
+
+    **params : float or array
+              parameters of the method, p and etp are checked as well
+
+    Returns
+    -------
+    valid : array of bool
+           True where all parameters are within their ranges
+    '''
+    valid = np.ones(np.broadcast_shapes(*[np.shape(val) for val
+                                          in params.values()]), dtype=bool)
+    for param, val in params.items():
+        checked = _invalid(method, param, val)
+        if checked is not None:
+            valid &= ~checked[0]
+    return valid
+
+
+def validBatch(method, policy='flag', **params):
+    '''
+    Checks arrays of parameters of a method of StudyArea against their
+    ranges of validity in one pass (one row per element).
+
+    Parameters
+    ----------
+    method : string
+            name of the method, e.g. "roof" or "permeable_surface"
+
+    policy : string, optional
+            what to do with invalid rows. The default is 'flag'.
+              'raise': exception listing the invalid rows
+              'drop': invalid rows are removed from the parameters
+              'clip': values are clipped to their range of validity
+              'flag': parameters are returned unchanged
+
+    **params : float or array
+              parameters of the method, p and etp are checked as well
+
+    Returns
+    -------
+    params : dict
+            parameters according to the policy (scalars are kept)
+
+    valid : 1D array of bool
+           True for rows with all parameters within their ranges
+
+    report : dict
+            row number -> description of the invalid values, only for
+            invalid rows
+    '''
+    if policy not in ('raise', 'drop', 'clip', 'flag'):
+        raise Exception(f"Unknown policy {policy}."
+                        " Acceptable: raise, drop, clip or flag")
+    n = np.broadcast(*[np.asarray(val) for val in params.values()]).size
+    valid = np.ones(n, dtype=bool)
+    invalid = {}
+    checked = dict(params)
+
+    for param, val in params.items():
+        result = _invalid(method, param, val)
+        if result is None:
+            continue
+        bad, key, limits = result
+        val = np.asarray(val, dtype=float)
+        bad = np.broadcast_to(bad, (n,))
+        if bad.any():
+            invalid[param] = (bad, np.broadcast_to(val, (n,)), limits)
+            valid &= ~bad
+            if policy == 'clip':
+                if method == 'permeable_surface' and param == 'fa':
+                    val = np.where((val > 5) & (val < 6),
+                                   np.where(val < 5.5, 5, 6), val)
+                checked[param] = np.clip(val, param_ranges[key][0],
+                                         param_ranges[key][1])
+
+    report = {}
+    for row in np.flatnonzero(~valid):
+        report[int(row)] = '; '.join(
+            f"{param} = {val[row]:g} not in {limits}"
+            for param, (bad, val, limits) in invalid.items() if bad[row])
+
+    if policy == 'raise' and report:
+        rows = ', '.join(f'{row}: {text}' for row, text in
+                         list(report.items())[:10])
+        raise Exception(f"{len(report)} of {n} rows are not valid"
+                        f" for {method} ({rows}"
+                        f"{', ...' if len(report) > 10 else ''})")
+    if policy == 'drop':
+        checked = {k: np.asarray(val)[valid] if np.ndim(val) else val
+                   for k, val in checked.items()}
+    return checked, valid, report
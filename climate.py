@@ -5,6 +5,8 @@ Created on Mon Feb 22 13:02:41 2021
 @author: Edwin Echeverri Salazar
 """
 
+import numpy as np
+
 #  Source: DWD, climatology 1991-2020, values aggregated and extracted from
 #  https://opendata.dwd.de/climate_environment/CDC/grids_germany/multi_annual/precipitation/
 #  https://opendata.dwd.de/climate_environment/CDC/grids_germany/multi_annual/evapo_p/
@@ -70,6 +72,68 @@ climate_dict = {
     'default' : [720, 630],
 }
 
+# coordinates (latitude, longitude in degrees, WGS84) of the city centres
+climate_coords = {
+    'Augsburg' : [48.371, 10.898],
+    'Berlin' : [52.520, 13.405],
+    'Bielefeld' : [52.030, 8.533],
+    'Bonn' : [50.737, 7.098],
+    'Braunschweig' : [52.269, 10.527],
+    'Bremen' : [53.079, 8.802],
+    'Bremerhaven' : [53.540, 8.581],
+    'Chemnitz' : [50.828, 12.921],
+    'Coburg' : [50.261, 10.963],
+    'Cottbus' : [51.756, 14.333],
+    'Dortmund' : [51.514, 7.465],
+    'Dresden' : [51.050, 13.737],
+    'Duisburg' : [51.434, 6.762],
+    'Düsseldorf' : [51.228, 6.774],
+    'Emden' : [53.367, 7.206],
+    'Erfurt' : [50.985, 11.030],
+    'Essen' : [51.456, 7.012],
+    'Flensburg' : [54.794, 9.447],
+    'Frankfurt am Main' : [50.111, 8.682],
+    'Freiburg im Breisgau' : [47.999, 7.842],
+    'Fürth' : [49.477, 10.989],
+    'Gera' : [50.881, 12.083],
+    'Gießen' : [50.584, 8.678],
+    'Göttingen' : [51.541, 9.916],
+    'Hamburg' : [53.551, 9.994],
+    'Hannover' : [52.376, 9.732],
+    'Heidelberg' : [49.399, 8.672],
+    'Hof' : [50.314, 11.913],
+    'Ingolstadt' : [48.767, 11.426],
+    'Jena' : [50.927, 11.589],
+    'Karlsruhe' : [49.007, 8.404],
+    'Kassel' : [51.313, 9.480],
+    'Kiel' : [54.323, 10.123],
+    'Koblenz' : [50.357, 7.589],
+    'Köln' : [50.938, 6.960],
+    'Leipzig' : [51.340, 12.373],
+    'Lübeck' : [53.866, 10.687],
+    'Magdeburg' : [52.121, 11.628],
+    'Mainz' : [49.993, 8.247],
+    'Mannheim' : [49.488, 8.466],
+    'München' : [48.137, 11.575],
+    'Münster' : [51.961, 7.626],
+    'Nürnberg' : [49.452, 11.077],
+    'Oldenburg' : [53.144, 8.214],
+    'Osnabrück' : [52.279, 8.047],
+    'Passau' : [48.575, 13.461],
+    'Potsdam' : [52.391, 13.065],
+    'Regensburg' : [49.013, 12.102],
+    'Rosenheim' : [47.857, 12.128],
+    'Rostock' : [54.092, 12.099],
+    'Saarbrücken' : [49.240, 6.997],
+    'Schwerin' : [53.636, 11.401],
+    'Stralsund' : [54.309, 13.082],
+    'Stuttgart' : [48.776, 9.183],
+    'Ulm' : [48.401, 9.988],
+    'Wiesbaden' : [50.078, 8.240],
+    'Wuppertal' : [51.256, 7.151],
+    'Würzburg' : [49.791, 9.953],
+}
+
 def climate(place):
     if place not in climate_dict.keys():
         default = 'default'
@@ -78,4 +142,92 @@ def climate(place):
         place = default
     p = climate_dict[place][0]
     etp = climate_dict[place][1]
-    return p, etp
\ No newline at end of file
+    return p, etp
+
+
+# index for lookups by coordinates: cities as unit vectors in 3D, so that
+# the nearest cities of many points are found with one matrix product
+_EARTH_RADIUS = 6371.0
+# maximum distance (km) of coordinates to the nearest city, every place in
+# Germany is within about 130 km of one of the cities
+MAX_DISTANCE = 150.0
+_names = np.array(list(climate_coords.keys()))
+_pe = np.array([climate_dict[name] for name in _names])
+
+def _unit_vectors(lat, lon):
+    lat, lon = np.radians(lat), np.radians(lon)
+    return np.stack([np.cos(lat)*np.cos(lon), np.cos(lat)*np.sin(lon),
+                     np.sin(lat)], axis=-1)
+
+_xyz = _unit_vectors(*np.array(list(climate_coords.values())).T)
+
+def _nearest(lat, lon, k):
+    # great circle distances (km) and indices of the k nearest cities
+    xyz = _unit_vectors(*np.broadcast_arrays(np.asarray(lat, dtype=float),
+                                             np.asarray(lon, dtype=float)))
+    chord = np.sqrt(np.maximum(2 - 2*xyz @ _xyz.T, 0))
+    if k == 1:
+        index = chord.argmin(axis=-1)[..., None]
+    else:
+        index = np.argpartition(chord, k - 1, axis=-1)[..., :k]
+    chord = np.take_along_axis(chord, index, axis=-1)
+    return 2*_EARTH_RADIUS*np.arcsin(np.minimum(chord/2, 1)), index
+
+def nearest_city(lat, lon):
+    """
+    Name of the nearest city in climate_coords and its distance (km).
+    lat and lon may be arrays, then arrays are returned.
+    """
+    distance, index = _nearest(lat, lon, 1)
+    names = _names[index[..., 0]]
+    if names.ndim == 0:
+        return str(names), float(distance[..., 0])
+    return names, distance[..., 0]
+
+def climate_at(lat, lon, k=1, power=2, max_distance=MAX_DISTANCE):
+    """
+    P and ETP for coordinates taken from the nearest city (k=1) or inverse
+    distance weighted from the k nearest cities.
+
+    Parameters
+    ----------
+    lat, lon : float or array
+        Latitude and longitude in degrees (WGS84)
+    k : int, optional
+        Number of cities used, 1 to the number of cities in climate_coords.
+        The default is 1.
+    power : float, optional
+        Power of the inverse distance weights. The default is 2.
+    max_distance : float, optional
+        Maximum distance (km) to the nearest city, None for no limit. The
+        default is MAX_DISTANCE.
+
+    Raises
+    ------
+    Exception
+        If k is out of range or coordinates are farther than max_distance
+        from all cities (e.g. outside of Germany).
+
+    Returns
+    -------
+    p, etp : float or array
+    """
+    if not 1 <= k <= len(_names):
+        raise Exception(f"k must be between 1 and {len(_names)}, got {k}")
+    distance, index = _nearest(lat, lon, k)
+    if max_distance is not None:
+        nearest = np.ravel(distance.min(axis=-1))
+        if np.any(nearest > max_distance):
+            far = np.argmax(nearest > max_distance)
+            lat_far, lon_far = (np.ravel(x)[far] for x in
+                                np.broadcast_arrays(lat, lon))
+            raise Exception(
+                f"Coordinates {lat_far}, {lon_far} are {nearest[far]:.0f} km"
+                f" from the nearest city (more than {max_distance:.0f} km),"
+                " no climate data")
+    weights = 1/np.maximum(distance, 1e-6)**power
+    weights /= weights.sum(axis=-1, keepdims=True)
+    p, etp = np.moveaxis((_pe[index]*weights[..., None]).sum(axis=-2), -1, 0)
+    if p.ndim == 0:
+        return float(p), float(etp)
+    return p, etp
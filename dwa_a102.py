@@ -6,10 +6,83 @@ Created on Sun Feb 21 16:42:52 2021
 """
 
 import numpy as np
-import pandas as pd
-from check_ranges import validRange
-from climate import climate
-from simple_bagluva import bagrov, direct_runoff_ratio
+from check_ranges import validRange, validJointRatio, validBatch
+from climate import climate, climate_at
+from instrumentation import instrument
+from simple_bagluva import etr_ratio, direct_runoff_ratio
+from results import COLUMNS, VOLUMES, ElementResult, ResultTable
+import regressions
+
+# methods of Surface that can be evaluated in batch mode
+SURFACE_ELEMENTS = ('garden', 'roof', 'flat_area', 'green_roof',
+                    'green_roof_shallow', 'storage_roof', 'permeable_surface',
+                    'porous_surface', 'paver_stonegrid', 'gravel_cover')
+
+
+def _element_results(element, area, p, etp, a, g, v, e, as_frame=True):
+    '''
+    Collects the water balance components of a surface element. Scalar
+    inputs yield a DataFrame with a single row (or an ElementResult),
+    array inputs (batch mode) yield one row per entry, built from whole
+    columns at once (DataFrame or ResultTable).
+    '''
+    if np.broadcast(area, a, g, v, e).ndim == 0:
+        a, g, v, e = float(a), float(g), float(v), float(e)
+        results = ElementResult(element, round(area, 3), round(area*a), p,
+                                etp, round(a, 3), round(g, 3), round(v, 3),
+                                round(e, 3), round(area*p/1000),
+                                round(area*p*a/1000), round(area*p*g/1000),
+                                round(area*p*v/1000), round(area*p*e/1000))
+        if as_frame:
+            return results.to_frame()
+        return results
+
+    area, a, g, v, e = (np.ravel(x).astype(float) for x in
+                        np.broadcast_arrays(area, a, g, v, e))
+    results = {'Element' : element, 'Area' : np.round(area, 3),
+               'Au' : np.round(area*a), 'P': p, 'Etp' : etp,
+               'a' : np.round(a, 3), 'g' : np.round(g, 3),
+               'v' : np.round(v, 3), 'e' : np.round(e, 3),
+               'Vp': np.round(area*p/1000),
+               'Va' : np.round(area*p*a/1000),
+               'Vg' : np.round(area*p*g/1000),
+               'Vv' : np.round(area*p*v/1000),
+               'Ve' : np.round(area*p*e/1000)}
+    if as_frame:
+        import pandas as pd
+        return pd.DataFrame(results, columns=COLUMNS)
+    return ResultTable({c: results[c].tolist() if np.ndim(results[c])
+                        else [results[c]]*len(area) for c in COLUMNS})
+
+
+# names of measures in the column Element of their results
+MEASURE_NAMES = ('Drainage', 'Surface infilt.', 'Infilt. swale',
+                 'Swale trench', 'Swale trench system', 'Rainwater usage',
+                 'pond_system')
+
+
+def _connect(surfaces):
+    '''
+    Gathers the results of the surfaces connected to a measure. Returns a
+    ResultTable (with Va = 0, since runoff is passed to the measure), the
+    connected area Au and the runoff volume Va. Au and Va are taken from
+    the last row of results of measures (which already contain their
+    inflow) and summed over all rows of surfaces (e.g. from batch()).
+    '''
+    previous_results = ResultTable()
+    au = 0
+    va = 0
+    for df in surfaces:
+        start = len(previous_results)
+        previous_results.append(df)
+        if previous_results.last('Element') in MEASURE_NAMES:
+            start = len(previous_results) - 1
+        au += float(sum(previous_results.columns['Au'][start:]))
+        va += float(sum(previous_results.columns['Va'][start:]))
+    
+    # Runoff volume are passed to measure, Va = 0
+    previous_results.columns['Va'] = [0]*len(previous_results)
+    return previous_results, au, va
 
 #%% Starting class Surface
 
@@ -19,12 +92,14 @@ class Surface(object):
         return (
             "Class that contain the methods: garden(), roof(), flat_area(), "
             "green_roof(), storage_roof(), permeable_surface(), porous_surface(), "
-            "paver_stonegrid(), and gravel_cover()"
+            "paver_stonegrid(), and gravel_cover(). Many elements of one type "
+            "can be evaluated at once with batch()"
             )
 
 #%% Berechnungsansatz: Grünflächen, Garten 
 #### unpaved or green areas or gardends
 
+    @instrument
     def garden(self, area, a=0.2, g=0.2, v=0.6):
         '''
         Calculates water balance components for green areas, gardens
@@ -60,22 +135,14 @@ class Surface(object):
         results : DataFrame    
         '''    
 
-        e = 0
-        results = [{'Element' : 'Garden / green area', 'Area' : round(area, 3),
-                    'Au' : round(area*a), 'P': self.p, 'Etp' : self.etp,
-                    'a' : round(a, 3), 'g' : round(g, 3), 'v' : round(v, 3),
-                    'e' : round(e, 3), 'Vp': round(area*self.p/1000),
-                    'Va' : round(area*self.p*a/1000),
-                    'Vg' : round(area*self.p*g/1000),
-                    'Vv' : round(area*self.p*v/1000),
-                    'Ve' : round(area*self.p*e/1000)}]
-        
-        results = pd.DataFrame(results)
-        return(results)
+        a, g, v, e = regressions.garden(self.p, self.etp, a, g, v)
+        return _element_results('Garden / green area', area, self.p, self.etp,
+                                a, g, v, e, self.as_frame)
 
 #%% Berechnungsansatz A.2: Steildach Steildächer (alle Materialien), 
 #### Flachdach (glatte Materialien) 
 
+    @instrument
     def roof(self, area, sp=0.3):
         '''
         Calculates water balance components for steep roofs (all materials)
@@ -104,26 +171,14 @@ class Surface(object):
         '''    
         validRange(sp, 'Sp_roof')
         
-        a = (0.9115 + 0.00007063*self.p - 0.000007498*self.etp
-             - 0.2063*np.log(sp + 1))
-        g = 0
-        v = 1-a-g
-        e = 0
-        results = [{'Element' : 'Roof', 'Area' : round(area, 3),
-                    'Au' : round(area*a), 'P': self.p, 'Etp' : self.etp,
-                    'a' : round(a, 3), 'g' : round(g, 3), 'v' : round(v, 3),
-                    'e' : round(e, 3), 'Vp': round(area*self.p/1000),
-                    'Va' : round(area*self.p*a/1000),
-                    'Vg' : round(area*self.p*g/1000),
-                    'Vv' : round(area*self.p*v/1000),
-                    'Ve' : round(area*self.p*e/1000)}]
-        
-        results = pd.DataFrame(results)
-        return(results)
+        a, g, v, e = regressions.roof(self.p, self.etp, sp)
+        return _element_results('Roof', area, self.p, self.etp,
+                                a, g, v, e, self.as_frame)
     
     #%% Berechnungsansatz A.3: Flachdächer (raue Materialien, Kies), Asphalt,
     #### fugenloser Beton,Pflaster mit dichten Fugen
      
+    @instrument
     def flat_area(self, area, sp=1):
         '''
         Calculates water balance components for flat roofs, asphalt, 
@@ -158,24 +213,12 @@ class Surface(object):
         validRange(self.etp, 'ETp')
         validRange(sp, 'Sp_flat_area') 
         
-        a = (0.8658 + 0.0001659*self.p - 0.00009945*self.etp
-             - 0.1542*np.log(sp + 1))
-        g = 0
-        v = 1-a-g
-        e = 0
-        results = [{'Element' : 'Flat area', 'Area' : round(area, 3),
-                    'Au' : round(area*a), 'P': self.p, 'Etp' : self.etp,
-                    'a' : round(a, 3), 'g' : round(g, 3), 'v' : round(v, 3),
-                    'e' : round(e, 3), 'Vp': round(area*self.p/1000),
-                    'Va' : round(area*self.p*a/1000),
-                    'Vg' : round(area*self.p*g/1000),
-                    'Vv' : round(area*self.p*v/1000),
-                    'Ve' : round(area*self.p*e/1000)}]
-        
-        results = pd.DataFrame(results)
-        return(results)
+        a, g, v, e = regressions.flat_area(self.p, self.etp, sp)
+        return _element_results('Flat area', area, self.p, self.etp,
+                                a, g, v, e, self.as_frame)
     
     #%% Berechnungsansatz A.4: Gründächer    
+    @instrument
     def green_roof(self, area, h, fg=1.0, AWC=0.5):
         '''
         Calculates water balance components for green roofs
@@ -218,24 +261,11 @@ class Surface(object):
         #     + 0.01628*np.log(wkmax_wp) - 0.1214*np.log(wkmax_wp*h))
         
         # new (March 2022)
-        a = -8.3518 - 0.2455*fg - 0.1095*np.log(h) - 0.05748/AWC - \
-            0.4256*AWC + 1.781*np.log(self.p) - 0.002133 * self.p + \
-            7.7488E-7 * (self.p - self.etp)**2 - 0.0005051 * self.etp
-        
-        g = 0
-        v = 1-a-g
-        e = 0
-        results = [{'Element' : 'Green roof', 'Area' : round(area, 3),
-                    'Au' : round(area*a), 'P': self.p, 'Etp' : self.etp,
-                    'a' : round(a, 3), 'g' : round(g, 3), 'v' : round(v, 3),
-                    'e' : round(e, 3), 'Vp': round(area*self.p/1000),
-                    'Va' : round(area*self.p*a/1000),
-                    'Vg' : round(area*self.p*g/1000),
-                    'Vv' : round(area*self.p*v/1000),
-                    'Ve' : round(area*self.p*e/1000)}] 
-        results = pd.DataFrame(results)
-        return(results)
+        a, g, v, e = regressions.green_roof(self.p, self.etp, h, fg, AWC)
+        return _element_results('Green roof', area, self.p, self.etp,
+                                a, g, v, e, self.as_frame)
         
+    @instrument
     def green_roof_shallow(self, area):
         '''
         Calculates water balance components for shallow green roofs < 4cm
@@ -255,23 +285,12 @@ class Surface(object):
         results : DataFrame
         '''
         
-        a = -1.327185 + -0.000066 * self.p + -0.000398 * self.etp + 0.336548 * np.log(self.p) + -3.050779e-08 * (self.p-self.etp)**2
-        
-        g = 0
-        v = 1-a-g
-        e = 0
-        results = [{'Element' : 'Green roof shallow', 'Area' : round(area, 3),
-                    'Au' : round(area*a), 'P': self.p, 'Etp' : self.etp,
-                    'a' : round(a, 3), 'g' : round(g, 3), 'v' : round(v, 3),
-                    'e' : round(e, 3), 'Vp': round(area*self.p/1000),
-                    'Va' : round(area*self.p*a/1000),
-                    'Vg' : round(area*self.p*g/1000),
-                    'Vv' : round(area*self.p*v/1000),
-                    'Ve' : round(area*self.p*e/1000)}]
-        results = pd.DataFrame(results)
-        return(results)
+        a, g, v, e = regressions.green_roof_shallow(self.p, self.etp)
+        return _element_results('Green roof shallow', area, self.p, self.etp,
+                                a, g, v, e, self.as_frame)
 
     #%% Berechnungsansatz A.5: Einstaudächer
+    @instrument
     def storage_roof(self, area, sp=5):
         '''
         Calculates water balance components for storage roofs
@@ -298,24 +317,14 @@ class Surface(object):
         '''
         validRange(sp, 'Sp_storage_roof') 
         
-        a = 0.9231 + 0.000254*self.p - 0.0003226*self.etp - 0.1472*np.log(sp+1)
-        g = 0
-        v = 1-a-g 
-        e = 0
-        results = [{'Element' : 'Storage roof', 'Area' : round(area, 3),
-                    'Au' : round(area*a), 'P': self.p, 'Etp' : self.etp,
-                    'a' : round(a, 3), 'g' : round(g, 3), 'v' : round(v, 3),
-                    'e' : round(e, 3), 'Vp': round(area*self.p/1000),
-                    'Va' : round(area*self.p*a/1000),
-                    'Vg' : round(area*self.p*g/1000),
-                    'Vv' : round(area*self.p*v/1000),
-                    'Ve' : round(area*self.p*e/1000)}]    
-        results = pd.DataFrame(results)
-        return(results)
+        a, g, v, e = regressions.storage_roof(self.p, self.etp, sp)
+        return _element_results('Storage roof', area, self.p, self.etp,
+                                a, g, v, e, self.as_frame)
         
     #%% Berechnungsansatz A.6 & A.7: Teildurchlässige Flächenbeläge
     ### (Fugenanteil 2 % bis 10 %)
     # Partially permeable surfaces (Joint ratio 2 % to 10 %)
+    @instrument
     def permeable_surface(self, area, fa, kf, sp=1, wkmax_wp=0.15):
         '''
         Calculates water balance components for permeable surfaces
@@ -356,52 +365,22 @@ class Surface(object):
         results : DataFrame 
         '''
         
-    ### Berechnungsansatz A.6: Teildurchlässige Flächenbeläge
-    ### (Fugenanteil 2 % bis 5 %)
-    # Partially permeable surfaces (Joint ratio 2 % to 5 %)   
-        if (fa >= 2 and fa <= 5):
-            a = (0.0800734*np.log(self.p) - 0.0582828*fa - 0.0501693*sp
-                  - 0.385767*wkmax_wp + (8.7040284/(11.9086896 + kf)))
-            # DWA-a-102 2020 equation:
-            # g = (-0.2006 - 0.000253*self.etp + 0.05615*fa - 0.0636*np.log(1 + sp)
-            #      + 0.1596*np.log(1 + kf) + 0.2778*(wkmax_wp))
-            v = (0.8529 - 0.1248*np.log(self.p) + 0.00005057*self.etp + 0.002372*fa
-                  + 0.1583*np.log(1 + sp))
-            # To fullfill the conservation mass (a+g+v=1). My decision is to apply:
-            g = 1-a-v
-    
-    ### Berechnungsansatz A.7: Teildurchlässige Flächenbeläge
-    ### (Fugenanteil 6 % bis 10 %)
-    # Partially permeable surfaces (Joint ratio 6 % to 10 %)
-    # This funtion can be joint with the previous one and add the param "slope"     
-        if (fa >= 6 and fa <= 10):
-            a = (0.05912*np.log(self.p) - 0.02749*fa - 0.03671*sp
-                  - 0.30514*wkmax_wp + (4.97687/(4.7975 + kf)))
-            # DWA-a-102 2020 equation:
-            # g = (0.00004941*P - 0.0002817*self.etp + 0.02566*fa - 0.03823*sp
-            #      + 0.691*np.exp(-6.465/kf))
-            v = (0.9012 - 0.1325*np.log(self.p) + 0.00006661*self.etp + 0.002302*fa
-                  + 0.1489*np.log(1 + sp))
-            g = 1 - (a + v)
-     
-        e = 0
+    ### Berechnungsansatz A.6 (Fugenanteil 2 % bis 5 %) and A.7 (Fugenanteil
+    ### 6 % bis 10 %), the equations are selected by the joint ratio
+        validJointRatio(fa)
+
+        a, g, v, e = regressions.permeable_surface(self.p, self.etp, fa, kf,
+                                                   sp, wkmax_wp)
 
-        results = [{'Element' : 'Permeable surface', 'Area' : round(area, 3),
-                    'Au' : round(area*a), 'P': self.p, 'Etp' : self.etp,
-                    'a' : round(a, 3), 'g' : round(g, 3), 'v' : round(v, 3),
-                    'e' : round(e, 3), 'Vp': round(area*self.p/1000),
-                    'Va' : round(area*self.p*a/1000),
-                    'Vg' : round(area*self.p*g/1000),
-                    'Vv' : round(area*self.p*v/1000),
-                    'Ve' : round(area*self.p*e/1000)}]     
-        results = pd.DataFrame(results)
-        return(results)
+        return _element_results('Permeable surface', area, self.p, self.etp,
+                                a, g, v, e, self.as_frame)
         
     #%% Berechnungsansatz A.8: Teildurchlässige Flächenbeläge 
     #### (Poren- und Sickersteine, Schotterrasen, Kies)
     # Partially permeable surfaces
     # (pore stones, seepage stones), gravel surface, gravel lawn
     
+    @instrument
     def porous_surface(self, area, sp=3.5, h=100, kf=180):
         '''
         Calculates water balance components for porous surfaces 
@@ -442,28 +421,14 @@ class Surface(object):
         validRange(h, 'h_porous_surface')
         validRange(kf, 'kf_porous_surface')
     
-        a = (0.000001969*self.p - 0.005116*np.log(sp) - 0.0001051*h
-              + 0.01753*np.exp(4.576/kf))
-        # g = (0.2468883*np.log(self.p) - 0.0003938*self.etp + 0.0017083*sp
-        #      - 0.0015998*h - 0.6703502*np.exp(0.1122885/kf))
-        v = (0.2111 - 0.2544*np.log(self.p) + 0.2073*np.log(self.etp)
-              + 0.0006249*sp + 0.123*np.log(h) - 0.000002806*kf)
-        g = max((1 - (a + v)), 0.0) 
-        e = 0
-        results = [{'Element' : 'Porous surface', 'Area' : round(area, 3),
-                    'Au' : round(area*a), 'P': self.p, 'Etp' : self.etp,
-                    'a' : round(a, 3), 'g' : round(g, 3), 'v' : round(v, 3),
-                    'e' : round(e, 3), 'Vp': round(area*self.p/1000),
-                    'Va' : round(area*self.p*a/1000),
-                    'Vg' : round(area*self.p*g/1000),
-                    'Vv' : round(area*self.p*v/1000),
-                    'Ve' : round(area*self.p*e/1000)}]     
-        results = pd.DataFrame(results)
-        return(results)
+        a, g, v, e = regressions.porous_surface(self.p, self.etp, sp, h, kf)
+        return _element_results('Porous surface', area, self.p, self.etp,
+                                a, g, v, e, self.as_frame)
         
     #%% Berechnungsansatz A.9: Rasengittersteine
     # Paver stone grids / Grass pavers
     
+    @instrument
     def paver_stonegrid(self, area, fa=25, sp=1, wkmax_wp=0.15):
         '''
         Calculates water balance components for paver stone grids
@@ -503,30 +468,16 @@ class Surface(object):
         validRange(sp, 'Sp_paver_stonegrid')
         validRange(wkmax_wp, 'WKmax_WP_paver_stonegrid') 
     
-        a = (0.145704 - 0.059177*np.log(fa) - 0.007354*sp
-              - 0.050531*np.log(wkmax_wp))
-        # g = (- 0.02927 + 0.1483*np.log(self.p) - 0.000269*self.etp
-        #      - 0.09913*np.log(1 + sp) + 0.05222*(wkmax_wp))
-        v = (1.106 - 0.1625*np.log(self.p) + 0.0001282*self.etp
-              + 0.1131*np.log(1 + sp) + 0.2848*wkmax_wp)
-        g = max((1 - (a + v)), 0.0)
-
-        e = 0
-        results = [{'Element' : 'Paver stone-grid', 'Area' : round(area, 3),
-                    'Au' : round(area*a), 'P': self.p, 'Etp' : self.etp,
-                    'a' : round(a, 3), 'g' : round(g, 3), 'v' : round(v, 3),
-                    'e' : round(e, 3), 'Vp': round(area*self.p/1000),
-                    'Va' : round(area*self.p*a/1000),
-                    'Vg' : round(area*self.p*g/1000),
-                    'Vv' : round(area*self.p*v/1000),
-                    'Ve' : round(area*self.p*e/1000)}]       
-        results = pd.DataFrame(results)
-        return(results)
+        a, g, v, e = regressions.paver_stonegrid(self.p, self.etp, fa, sp,
+                                                 wkmax_wp)
+        return _element_results('Paver stone-grid', area, self.p, self.etp,
+                                a, g, v, e, self.as_frame)
         
     #%% Berechnungsansatz A.10: Deckschichten ohne Bindemittel (wassergebundene Decke) 
     # Wassergebundene Decke, offiziell Deckschicht ohne Bindemittel (Kürzel: DoB)
     # gravel ground cover
     
+    @instrument
     def gravel_cover(self, area, h=100, sp=3.5, kf=1.8):
         '''
         Calculates water balance components for gravel covers or surfaces
@@ -567,24 +518,67 @@ class Surface(object):
         validRange(sp, 'Sp_gravel_cover')
         validRange(kf, 'kf_gravel_cover')     
         
-        a = 0.00004517*self.p - 0.03454*np.log(sp) + (0.1958/(0.2873 + kf))
-        # g = (0.19761*np.log(self.p) - 0.000506*self.etp + 0.016372*sp - 0.001618*h
-        #      - 0.327742*np.exp(0.346808/kf))
-        v = (0.2111 - 0.2544*np.log(self.p) + 0.2073*np.log(self.etp)
-              + 0.0006249*sp + 0.123*np.log(h) - 0.000002806*kf)
-        g = max((1 - (a + v)), 0.0)
-        e = 0
-        # pfractions = (a, g, v)
-        results = [{'Element' : 'Gravel cover', 'Area' : round(area, 3),
-                    'Au' : round(area*a), 'P': self.p, 'Etp' : self.etp,
-                    'a' : round(a, 3), 'g' : round(g, 3), 'v' : round(v, 3),
-                    'e' : round(e, 3), 'Vp': round(area*self.p/1000),
-                    'Va' : round(area*self.p*a/1000),
-                    'Vg' : round(area*self.p*g/1000),
-                    'Vv' : round(area*self.p*v/1000),
-                    'Ve' : round(area*self.p*e/1000)}]       
-        results = pd.DataFrame(results)
-        return(results)
+        a, g, v, e = regressions.gravel_cover(self.p, self.etp, h, sp, kf)
+        return _element_results('Gravel cover', area, self.p, self.etp,
+                                a, g, v, e, self.as_frame)
+
+    #%% Batch mode for many elements of the same type
+    @instrument
+    def batch(self, element, area, policy='raise', **params):
+        '''
+        Calculates water balance components for many elements of one type
+        at once (e.g. all parcels of a city)
+
+        Parameters
+        ----------
+        element : string
+                 name of the Surface method, e.g. "roof" or "gravel_cover"
+
+        area : array
+              element areas (m2)
+
+        policy : string, optional
+                handling of elements with parameters outside of their range
+                of validity (see check_ranges.validBatch): 'raise' (an
+                exception listing the invalid elements), 'drop' (invalid
+                elements are skipped) or 'clip' (parameters are clipped to
+                their range). The default is 'raise'.
+
+        **params : float or array
+                  parameters of the method (see its help), arrays must have
+                  the same length as area
+
+        Notes
+        ------
+        Parameters of all elements are checked in one pass. With
+        policy='drop', the index of the DataFrame refers to the position of
+        the elements in the inputs. A ResultTable (as_frame=False) has no
+        index, the valid elements are given by the mask of
+        check_ranges.validBatch(element, area=area, **params).
+
+        All rows are surfaces: passed to a measure, their connected areas
+        and runoff are summed up.
+
+        Returns
+        -------
+        results : DataFrame or ResultTable
+                 one row per element
+        '''
+        if element not in SURFACE_ELEMENTS:
+            raise Exception(f"{element} is not a surface element."
+                            f" Available: {', '.join(SURFACE_ELEMENTS)}")
+        if policy not in ('raise', 'drop', 'clip'):
+            raise Exception(f"Unknown policy {policy}."
+                            " Acceptable: raise, drop or clip")
+
+        area = np.atleast_1d(np.asarray(area, dtype=float))
+        params = {k: np.asarray(val, dtype=float) for k, val in params.items()}
+        params, valid, report = validBatch(element, policy, area=area,
+                                           **params)
+        results = getattr(self, element)(**params)
+        if policy == 'drop' and self.as_frame:
+            results.index = np.flatnonzero(valid)
+        return results
         
     #%% New class Measure
 class Measure(object):      
@@ -595,10 +589,21 @@ class Measure(object):
             "surf_infiltration(), infilt_swale(), swale_trench(), "
             "swale_trench_system(), rainwater_usage(), and pond_system()"
     )
+
+    def _output(self, previous_results, results):
+        '''
+        Adds the row of the measure to the results of the connected surfaces
+        and returns them as DataFrame or as ResultTable (as_frame=False)
+        '''
+        previous_results.append(results)
+        if self.as_frame:
+            return previous_results.to_frame()
+        return previous_results
     #%% Aufteilungswerte und Berechnungsansätze für Anlagen
     # Ableitung: Rohr, Rinne, steiler Graben
     # Drainage: pipe, channel, steep ditch
     
+    @instrument
     def drainage(self, drainage_type, *surfaces):
         '''
         Calculates water balance components for drainage elements
@@ -637,39 +642,22 @@ class Measure(object):
 
         area = 0
         e = 0
-        # calculating the area that produces runoff and volume of runoff
-        au = 0
-        va = 0
-        for df in surfaces:
-            au += float(df.iloc[-1]['Au'])
-            va += float(df.iloc[-1]['Va'])
-            
-        # A df with the previous results is required
-        previous_results = pd.DataFrame(columns = ['Element', 'Area', 'Au',
-                                                   'P', 'Etp','a', 'g', 'v', 
-                                                   'e', 'Vp', 'Va', 'Vg',
-                                                   'Vv', 'Ve'])
-                
-        # Joinning previous dfs of results
-        for df in surfaces:
-            previous_results = pd.concat([previous_results, df])
-            
-        # Runoff volume are passed to measure so, Va = 0
-        previous_results.Va = 0                      
+        # gathering connected surfaces, their runoff is passed to the measure
+        previous_results, au, va = _connect(surfaces)
 
-        results = [{'Element' : 'Drainage', 'Area' : round(area),
-                    'Au' : au, 'P': self.p, 'Etp' : self.etp,
-                    'a' : round(a, 3), 'g' : round(g, 3), 'v' : round(v, 3),
-                    'e' : round(e, 3), 'Vp': area*self.p/1000,
-                    'Va' : (area*self.p/1000 + va)*a,
-                    'Vg' : (area*self.p/1000 + va)*g,
-                    'Vv' : (area*self.p/1000 + va)*v,
-                    'Ve' : (area*self.p/1000 + va)*e}]      
-        results = pd.DataFrame(results)
-        return(pd.concat([previous_results, results], ignore_index=True))
+        results = {'Element' : 'Drainage', 'Area' : round(area),
+                   'Au' : au, 'P': self.p, 'Etp' : self.etp,
+                   'a' : round(a, 3), 'g' : round(g, 3), 'v' : round(v, 3),
+                   'e' : round(e, 3), 'Vp': area*self.p/1000,
+                   'Va' : (area*self.p/1000 + va)*a,
+                   'Vg' : (area*self.p/1000 + va)*g,
+                   'Vv' : (area*self.p/1000 + va)*v,
+                   'Ve' : (area*self.p/1000 + va)*e}
+        return self._output(previous_results, results)
     
     #%% Berechnungsansatz B.2: Flächenversickerung
     # Surface infiltration
+    @instrument
     def surf_infiltration(self, kf, *surfaces, fasf="fasf_standard"):
         '''
         Calculates water balance components for surface infiltration
@@ -699,51 +687,29 @@ class Measure(object):
         validRange(kf, 'kf_surf_infiltration') 
         
         if (fasf == "fasf_standard"):
-            fasf = 94741*kf**(-1.195)
-            fasf = 94741*kf**(-1.195)
+            fasf = regressions.surf_infiltration_fasf(kf)
             
-        a = 0.004264 + 0.001121*np.log(self.p) - 0.002757*np.log(fasf)
-        # g = (0.6207904 + 0.0899322*np.log(self.p) - 0.0001152*self.etp
-        #      - 0.0719723*np.log(self.fasf))
-        v = 0.3999 - 0.09317*np.log(self.p) + 0.00009746*self.etp + 0.07474*np.log(fasf)
-        g = max((1 - (a + v)), 0.0)              
-        e = 0
+        a, g, v, e = map(float, regressions.surf_infiltration(self.p, self.etp,
+                                                              kf, fasf))
         
-        # calculating the area that produces runoff and volume of runoff
-        au = 0
-        va = 0
-        for df in surfaces:
-            au += float(df.iloc[-1]['Au'])
-            va += float(df.iloc[-1]['Va'])
-            
-        # A df with the previous results is required
-        previous_results = pd.DataFrame(columns = ['Element', 'Area', 'Au',
-                                                   'P', 'Etp','a', 'g', 'v', 
-                                                   'e', 'Vp', 'Va', 'Vg',
-                                                   'Vv', 'Ve'])
-                
-        # Joinning previous dfs of results
-        for df in surfaces:
-            previous_results = pd.concat([previous_results, df])
-            
-        # Runoff volume are passed to measure, Va = 0
-        previous_results.Va = 0                      
+        # gathering connected surfaces, their runoff is passed to the measure
+        previous_results, au, va = _connect(surfaces)
 
         area = au*(fasf/100)
 
-        results = [{'Element' : 'Surface infilt.', 'Area' : round(area),
-                    'Au' : round(au), 'P': self.p, 'Etp' : self.etp,
-                    'a' : round(a, 3), 'g' : round(g, 3), 'v' : round(v, 3),
-                    'e' : round(e, 3), 'Vp': round(area*self.p/1000),
-                    'Va' : round((area*self.p/1000 + va)*a),
-                    'Vg' : round((area*self.p/1000 + va)*g),
-                    'Vv' : round((area*self.p/1000 + va)*v),
-                    'Ve' : round((area*self.p/1000 + va)*e)}]        
-        results = pd.DataFrame(results)
-        return(pd.concat([previous_results, results], ignore_index=True))
+        results = {'Element' : 'Surface infilt.', 'Area' : round(area),
+                   'Au' : round(au), 'P': self.p, 'Etp' : self.etp,
+                   'a' : round(a, 3), 'g' : round(g, 3), 'v' : round(v, 3),
+                   'e' : round(e, 3), 'Vp': round(area*self.p/1000),
+                   'Va' : round((area*self.p/1000 + va)*a),
+                   'Vg' : round((area*self.p/1000 + va)*g),
+                   'Vv' : round((area*self.p/1000 + va)*v),
+                   'Ve' : round((area*self.p/1000 + va)*e)}
+        return self._output(previous_results, results)
        
     #%% Berechnungsansatz B.3: Versickerungsmulden
     # Infiltration swale
+    @instrument
     def infilt_swale(self, kf, *surfaces, fasm="fasm_standard"):
         '''
         Calculates water balance components for infiltration swales
@@ -773,51 +739,28 @@ class Measure(object):
         validRange(kf, 'kf_infilt_swale')
         
         if (fasm == "fasm_standard"):
-            fasm = 42.323*kf**(-0.314)       
+            fasm = regressions.infilt_swale_fasm(kf)
         
-        g = (0.8608 + 0.02385*np.log(self.p) - 0.00005331*self.etp - 0.002827*fasm
-              - 0.000002493*kf + 0.0009514*np.log(kf/fasm))
-        v = 0.000008562*self.etp + (2.611/(self.p-64.35))*fasm**0.9425 - 0.000001211*kf
-        # To force positive values or zero
-        a = max((1 - (g + v)), 0.0)
-        e = 0
+        a, g, v, e = map(float, regressions.infilt_swale(self.p, self.etp, kf,
+                                                         fasm))
         
-        # calculating the area that produces runoff and volume of runoff
-        au = 0
-        va = 0
-        for df in surfaces:
-            au += float(df.iloc[-1]['Au'])
-            va += float(df.iloc[-1]['Va'])
-            
-        # A df with the previous results is required
-        #previous_results = pd.DataFrame(columns = ['Element', 'Area', 'Au',
-        #                                           'P', 'Etp','a', 'g', 'v', 
-        #                                           'e', 'Vp', 'Va', 'Vg',
-        #                                           'Vv', 'Ve'])
-                
-        # Joinning previous dfs of results
-        #for df in surfaces:
-        #    previous_results = pd.concat([previous_results, df])
-
-        previous_results = pd.concat(surfaces, ignore_index=True)
-        
-        # Runoff volume are passed to measure, Va = 0
-        previous_results.Va = 0                      
+        # gathering connected surfaces, their runoff is passed to the measure
+        previous_results, au, va = _connect(surfaces)
 
         area = au*(fasm/100)
 
-        results = [{'Element' : 'Infilt. swale', 'Area' : round(area),
-                    'Au' : round(au), 'P': self.p, 'Etp' : self.etp,
-                    'a' : round(a, 3), 'g' : round(g, 3), 'v' : round(v, 3),
-                    'e' : round(e, 3), 'Vp': round(area*self.p/1000),
-                    'Va' : round((area*self.p/1000 + va)*a),
-                    'Vg' : round((area*self.p/1000 + va)*g),
-                    'Vv' : round((area*self.p/1000 + va)*v),
-                    'Ve' : round((area*self.p/1000 + va)*e)}]        
-        results = pd.DataFrame(results)
-        return(pd.concat([previous_results, results], ignore_index=True))
+        results = {'Element' : 'Infilt. swale', 'Area' : round(area),
+                   'Au' : round(au), 'P': self.p, 'Etp' : self.etp,
+                   'a' : round(a, 3), 'g' : round(g, 3), 'v' : round(v, 3),
+                   'e' : round(e, 3), 'Vp': round(area*self.p/1000),
+                   'Va' : round((area*self.p/1000 + va)*a),
+                   'Vg' : round((area*self.p/1000 + va)*g),
+                   'Vv' : round((area*self.p/1000 + va)*v),
+                   'Ve' : round((area*self.p/1000 + va)*e)}
+        return self._output(previous_results, results)
     #%% Berechnungsansatz B.4: Mulden-Rigolen-Elemente
     # Swale-trench element
+    @instrument
     def swale_trench(self, kf, *surfaces, fasm="fasm_standard"):
         '''
         Calculates water balance components for swale-trench elements
@@ -847,51 +790,29 @@ class Measure(object):
         validRange(kf, 'kf_swale_trench')
         
         if (fasm == "fasm_standard"):
-            fasm = 21.86*kf**(-0.348)
+            fasm = regressions.swale_trench_fasm(kf)
             
-        a = (-0.03867 + 0.007684*np.log(self.p) + 0.000003201*fasm + 0.0002564*kf
-             - 0.0001187*fasm*kf + 0.004161*np.log(kf/fasm))
-        # g = (0.8803 + 0.01866*np.log(self.p) - 0.00004867*self.etp
-        #      - 0.001997*fasm + 0.0002365*kf)
-        v = 0.000008879*self.etp + (2.528/(self.p-81.65))*fasm**0.9496 - 0.00007768*kf
-        g = max((1 - (a + v)), 0.0)
-        e = 0
+        a, g, v, e = map(float, regressions.swale_trench(self.p, self.etp, kf,
+                                                         fasm))
         
-        # calculating the area that produces runoff and volume of runoff
-        au = 0
-        va = 0
-        for df in surfaces:
-            au += float(df.iloc[-1]['Au'])
-            va += float(df.iloc[-1]['Va'])
-            
-        # A df with the previous results is required
-        previous_results = pd.DataFrame(columns = ['Element', 'Area', 'Au',
-                                                   'P', 'Etp','a', 'g', 'v', 
-                                                   'e', 'Vp', 'Va', 'Vg',
-                                                   'Vv', 'Ve'])
-                
-        # Joinning previous dfs of results
-        for df in surfaces:
-            previous_results = pd.concat([previous_results, df])
-            
-        # Runoff volume are passed to measure, Va = 0
-        previous_results.Va = 0                      
+        # gathering connected surfaces, their runoff is passed to the measure
+        previous_results, au, va = _connect(surfaces)
 
         area = au*(fasm/100)
 
-        results = [{'Element' : 'Swale trench', 'Area' : round(area),
-                    'Au' : round(au), 'P': self.p, 'Etp' : self.etp,
-                    'a' : round(a, 3), 'g' : round(g, 3), 'v' : round(v, 3),
-                    'e' : round(e, 3), 'Vp': round(area*self.p/1000),
-                    'Va' : round((area*self.p/1000 + va)*a),
-                    'Vg' : round((area*self.p/1000 + va)*g),
-                    'Vv' : round((area*self.p/1000 + va)*v),
-                    'Ve' : round((area*self.p/1000 + va)*e)}]   
-        results = pd.DataFrame(results)
-        return(pd.concat([previous_results, results], ignore_index=True))
+        results = {'Element' : 'Swale trench', 'Area' : round(area),
+                   'Au' : round(au), 'P': self.p, 'Etp' : self.etp,
+                   'a' : round(a, 3), 'g' : round(g, 3), 'v' : round(v, 3),
+                   'e' : round(e, 3), 'Vp': round(area*self.p/1000),
+                   'Va' : round((area*self.p/1000 + va)*a),
+                   'Vg' : round((area*self.p/1000 + va)*g),
+                   'Vv' : round((area*self.p/1000 + va)*v),
+                   'Ve' : round((area*self.p/1000 + va)*e)}
+        return self._output(previous_results, results)
     
     #%% Berechnungsansatz B.5: Mulden-Rigolen-Systeme
     # Swale-trench system
+    @instrument
     def swale_trench_system(self, qdr, kf, *surfaces, fasm="fasm_standard"):
         '''
         Calculates water balance components for swale-trench elements
@@ -927,52 +848,29 @@ class Measure(object):
         
         
         if (fasm == "fasm_standard"):
-            fasm = 11.79 - 3.14*np.log(qdr) - 0.18594*kf
+            fasm = regressions.swale_trench_system_fasm(qdr, kf)
             
-        a = (0.8112 + 0.0003473*self.p - 0.00001845*self.etp - 0.04793*fasm
-              + 0.0007481*qdr - 0.4389*np.log(kf + 1))
-        # g = (1.669 - 0.3005*np.log(self.p) - 0.00006933*self.etp
-        #       + 0.3044*np.log(fasm) + 0.4581*np.log(kf + 1))
-        v = (0.1428 - 0.02661*np.log(self.p) + 0.00005668*self.etp + 0.0288*np.log(fasm)
-              - 0.0001825*qdr - 0.01823*np.log(kf + 1))
-        g = max((1 - (a + v)), 0.0)
-        e = 0
+        a, g, v, e = map(float, regressions.swale_trench_system(self.p, self.etp,
+                                                                qdr, kf, fasm))
         
-        # calculating the area that produces runoff and volume of runoff
-        au = 0
-        va = 0
-        for df in surfaces:
-            au += float(df.iloc[-1]['Au'])
-            va += float(df.iloc[-1]['Va'])
-            
-        # A df with the previous results is required
-        previous_results = pd.DataFrame(columns = ['Element', 'Area', 'Au',
-                                                   'P', 'Etp','a', 'g', 'v', 
-                                                   'e', 'Vp', 'Va', 'Vg',
-                                                   'Vv', 'Ve'])
-                
-        # Joinning previous dfs of results
-        for df in surfaces:
-            previous_results = pd.concat([previous_results, df])
-            
-        # Runoff volume are passed to measure, Va = 0
-        previous_results.Va = 0                      
+        # gathering connected surfaces, their runoff is passed to the measure
+        previous_results, au, va = _connect(surfaces)
 
         area = au*(fasm/100)
 
-        results = [{'Element' : 'Swale trench system', 'Area' : round(area),
-                    'Au' : round(au), 'P': self.p, 'Etp' : self.etp,
-                    'a' : round(a, 3), 'g' : round(g, 3), 'v' : round(v, 3),
-                    'e' : round(e, 3), 'Vp': round(area*self.p/1000),
-                    'Va' : round((area*self.p/1000 + va)*a),
-                    'Vg' : round((area*self.p/1000 + va)*g),
-                    'Vv' : round((area*self.p/1000 + va)*v),
-                    'Ve' : round((area*self.p/1000 + va)*e)}]
-        results = pd.DataFrame(results)
-        return(pd.concat([previous_results, results], ignore_index=True))
+        results = {'Element' : 'Swale trench system', 'Area' : round(area),
+                   'Au' : round(au), 'P': self.p, 'Etp' : self.etp,
+                   'a' : round(a, 3), 'g' : round(g, 3), 'v' : round(v, 3),
+                   'e' : round(e, 3), 'Vp': round(area*self.p/1000),
+                   'Va' : round((area*self.p/1000 + va)*a),
+                   'Vg' : round((area*self.p/1000 + va)*g),
+                   'Vv' : round((area*self.p/1000 + va)*v),
+                   'Ve' : round((area*self.p/1000 + va)*e)}
+        return self._output(previous_results, results)
     
     #%% Berechnungsansatz B.6: Anlagen zur Niederschlagswassernutzung
     # Rainwater usage
+    @instrument
     def rainwater_usage(self, vsp, vbr, fabw, qbw, *surfaces):
         '''
         Calculates water balance components for rainwater usage
@@ -1016,60 +914,30 @@ class Measure(object):
         validRange(qbw, 'qBw_rainwater_usage')
         
         
-        VBw = fabw*qbw
-        Vnmin = min(self.p, 365*vbr + VBw)
-        if VBw == 0:
-            v = 0
-        else:
-            v = (- 0.0001927*self.p + 0.0001831*self.etp + 0.0006083*VBw
-                 - 0.0000003127*VBw**2 - 0.3092*np.exp(3.269/vsp)
-                 + (1.424/(2.782 + vbr)) + 0.0001885*Vnmin)
-        if vbr == 0:
-            e = 0
-        else:
-            e = (0.4451 - 0.0003529*self.p - 0.00007728*self.etp + 0.06821*np.log10(vsp)
-                 - 0.0002507*VBw + 0.2349*np.log10(vbr) + 0.0001738*Vnmin)
-        a = max((1 - (v + e)), 0.0)
-        g = 0.0
-        
-        # calculating the area that produces runoff and volume of runoff
-        au = 0
-        va = 0
-        for df in surfaces:
-            au += float(df.iloc[-1]['Au'])
-            va += float(df.iloc[-1]['Va'])
-            
-        # A df with the previous results is required
-        previous_results = pd.DataFrame(columns = ['Element', 'Area', 'Au',
-                                                   'P', 'Etp','a', 'g', 'v', 
-                                                   'e', 'Vp', 'Va', 'Vg',
-                                                   'Vv', 'Ve'])
-                
-        # Joinning previous dfs of results
-        for df in surfaces:
-            previous_results = pd.concat([previous_results, df])
-            
-        # Runoff volume are passed to measure, Va = 0
-        previous_results.Va = 0                      
+        a, g, v, e = map(float, regressions.rainwater_usage(self.p, self.etp, vsp,
+                                                            vbr, fabw, qbw))
+        
+        # gathering connected surfaces, their runoff is passed to the measure
+        previous_results, au, va = _connect(surfaces)
 
         area = 0
 
-        results = [{'Element' : 'Rainwater usage', 'Area' : round(area),
-                    'Au' : round(au), 'P': self.p, 'Etp' : self.etp,
-                    'a' : round(a, 3), 'g' : round(g, 3), 'v' : round(v, 3),
-                    'e' : round(e, 3), 'Vp': round(area*self.p/1000),
-                    'Va' : round((area*self.p/1000 + va)*a),
-                    'Vg' : round((area*self.p/1000 + va)*g),
-                    'Vv' : round((area*self.p/1000 + va)*v),
-                    'Ve' : round((area*self.p/1000 + va)*e)}]
-        results = pd.DataFrame(results)
-        return(pd.concat([previous_results, results], ignore_index=True))
+        results = {'Element' : 'Rainwater usage', 'Area' : round(area),
+                   'Au' : round(au), 'P': self.p, 'Etp' : self.etp,
+                   'a' : round(a, 3), 'g' : round(g, 3), 'v' : round(v, 3),
+                   'e' : round(e, 3), 'Vp': round(area*self.p/1000),
+                   'Va' : round((area*self.p/1000 + va)*a),
+                   'Vg' : round((area*self.p/1000 + va)*g),
+                   'Vv' : round((area*self.p/1000 + va)*v),
+                   'Ve' : round((area*self.p/1000 + va)*e)}
+        return self._output(previous_results, results)
     
     #%% Berechnungsansatz B.7: Wasserfläche mit Dauerstau
     #### Water surface with permanent storage  
     # Pond system with inflow from paved areas
     #def pod_system(self, aw, A_1, a_1, *surfaces, A_2= 0, a_2= 0.0, A_3= 0, a_3= 0.0,
     #           A_4= 0, a_4= 0.0):
+    @instrument
     def pond_system(self, aw, *surfaces):
         '''
         Calculates water balance components for pod systems
@@ -1096,54 +964,29 @@ class Measure(object):
         #v = (self.etp*aw)/(self.p*(aw + (A_1*a_1 + A_2*a_2
         #                            + A_3*a_3 + A_4*a_4)))
 
-        # more general desgin of incorp. of inflow elements        
-        areas = aw
-        for si in surfaces:
-            areas += float(si.Au) # aw + sum(A_i * a_i)
-        
-        v = (self.etp*aw)/(self.p*areas)
-        
-        a = 1 - v
-        g = 0
-        e = 0
-        # calculating the area that produces runoff and volume of runoff
-        au = 0
-        va = 0
-        for df in surfaces:
-            au += float(df.iloc[-1]['Au'])
-            va += float(df.iloc[-1]['Va'])
-            
-        # A df with the previous results is required
-        previous_results = pd.DataFrame(columns = ['Element', 'Area', 'Au',
-                                                   'P', 'Etp','a', 'g', 'v', 
-                                                   'e', 'Vp', 'Va', 'Vg',
-                                                   'Vv', 'Ve'])
-                
-        # Joinning previous dfs of results
-        for df in surfaces:
-            previous_results = pd.concat([previous_results, df])
-            
-        # Runoff volume are passed to measure, Va = 0
-        previous_results.Va = 0                      
+        # gathering connected surfaces, their runoff is passed to the measure
+        previous_results, au, va = _connect(surfaces)
+
+        # more general desgin of incorp. of inflow elements, aw + sum(A_i * a_i)
+        a, g, v, e = map(float, regressions.pond_system(self.p, self.etp, aw, au))
 
         area = aw # M.Kielhorn: von Null auf aw gesetzt, damit die Fläche des Teichsystems angezeigt wird!
 
-        results = [{'Element' : 'pond_system', 'Area' : round(area),
-                    'Au' : round(au), 'P': self.p, 'Etp' : self.etp,
-                    'a' : round(a, 3), 'g' : round(g, 3), 'v' : round(v, 3),
-                    'e' : round(e, 3), 'Vp': round(area*self.p/1000),
-                    'Va' : round((area*self.p/1000 + va)*a),
-                    'Vg' : round((area*self.p/1000 + va)*g),
-                    'Vv' : round((area*self.p/1000 + va)*v),
-                    'Ve' : round((area*self.p/1000 + va)*e)}]
-        
-        results = pd.DataFrame(results)
-        return(pd.concat([previous_results, results], ignore_index=True))
+        results = {'Element' : 'pond_system', 'Area' : round(area),
+                   'Au' : round(au), 'P': self.p, 'Etp' : self.etp,
+                   'a' : round(a, 3), 'g' : round(g, 3), 'v' : round(v, 3),
+                   'e' : round(e, 3), 'Vp': round(area*self.p/1000),
+                   'Va' : round((area*self.p/1000 + va)*a),
+                   'Vg' : round((area*self.p/1000 + va)*g),
+                   'Vv' : round((area*self.p/1000 + va)*v),
+                   'Ve' : round((area*self.p/1000 + va)*e)}
+        return self._output(previous_results, results)
 
 
 #%% Starting class Surface
 class StudyArea(Surface, Measure):
-    def __init__(self, p=800, etp=500, location=None, p_corr_factor=1.0):
+    def __init__(self, p=800, etp=500, location=None, p_corr_factor=1.0,
+                 as_frame=True, coords=None, k_nearest=1):
         '''
         Creates a new study area object.
 
@@ -1157,6 +1000,19 @@ class StudyArea(Surface, Measure):
             City name to look up. The default is None.
         p_corr_factor : float, optional
             Sacling factor to correct preipiation for undercatch. The default is 1.0.
+        as_frame : boolean, optional
+            Whether surfaces and measures return DataFrames or compact
+            results (ElementResult for a single surface, ResultTable for
+            measures and batch mode), which are cheaper to pass on to
+            measures and to watbal and are converted with to_frame() when
+            needed. The default is True.
+        coords : tuple, optional
+            Latitude and longitude (degrees) of the site. P and ETP are taken
+            from the nearest city in climate_dict, unless location is given.
+            The default is None.
+        k_nearest : int, optional
+            Number of nearest cities used for coords, values are inverse
+            distance weighted for k_nearest > 1. The default is 1.
 
         Returns
         -------
@@ -1164,10 +1020,15 @@ class StudyArea(Surface, Measure):
 
         '''
         self.location = location        
+        self.as_frame = as_frame
         if self.location:
             p, etp = climate(self.location)
             self.p = p*p_corr_factor
             self.etp = etp
+        elif coords is not None:
+            p, etp = climate_at(*coords, k=k_nearest)
+            self.p = p*p_corr_factor
+            self.etp = etp
         else:
             self.p = p*p_corr_factor
             self.etp = etp
@@ -1181,6 +1042,7 @@ class StudyArea(Surface, Measure):
             f" and potential evapotranspiration of {self.etp} mm/a"
             )
     
+    @instrument
     def natural_wb_guess(self, bagrov_n,soil,slope,gwd,land,verbose=False):
         '''
         Makes a guess about the site's natural water balance and returns an
@@ -1213,13 +1075,8 @@ class StudyArea(Surface, Measure):
         # ration P/ETP
         n_pe = self.p / self.etp
         
-        # creat Bagrov curve
-        nPEis,nEis = bagrov(bagrov_n)
-        
-        #read value, check position of closest value
-        index = (np.abs(nPEis - n_pe)).argmin()
-        # corresponding ETR/ETP ratio and ETR calculation
-        n_e = nEis[index]
+        # corresponding ETR/ETP ratio from (cached) Bagrov curve and ETR
+        n_e = etr_ratio(n_pe, bagrov_n)
         ETR = n_e * self.etp
         
         # close water balance
@@ -1245,56 +1102,57 @@ class StudyArea(Surface, Measure):
         return ETR, Rd, GWR
         
 
-def watbal(*study_areas):
+@instrument
+def watbal(*study_areas, totals_only=False):
         '''
         Calculates water balance for a system compund of the ouputs from
         methods of StudyArea (Surfaces, Measures).
         
         Parameters
         ----------
-        args : DataFrame 
+        args : DataFrame, ResultTable or ElementResult
              outputs of methods from StudyArea (Surfaces, Measures)  
+        
+        totals_only : boolean, optional
+             Whether only the row of the system is returned, without the
+             table of all elements. The default is False.
                           
         Returns
         -------
         results : DataFrame 
         '''
         
-        # deprecation warning
-        #df_layout = pd.DataFrame(columns = ['Element', 'Area','a', 'g', 'v',
-        #                                           'e', 'Vp', 'Va', 'Vg',
-        #                                           'Vv', 'Ve'])
-        
-        area, vp, va, vg, vv, ve = 0, 0, 0, 0, 0, 0
+        # all outputs are gathered in one columnar table, the volumes of
+        # all elements are then summed up at once
+        table = ResultTable()
         for df in study_areas:
-            area += float(sum(df[:]['Area']))
-            vp += float(sum(df[:]['Vp']))
-            va += float(sum(df[:]['Va']))
-            vg += float(sum(df[:]['Vg']))
-            vv += float(sum(df[:]['Vv']))
-            ve += float(sum(df[:]['Ve']))
+            table.append(df)
+        area, vp, va, vg, vv, ve = table.array(VOLUMES).sum(axis=0)
         a = round(va/vp, 3)
         g = round(vg/vp, 3)
         v = round(vv/vp, 3)
         e = round(ve/vp, 3)
         
-        sys_results = [{'Element' : 'System', 'Area' : round(area),
-                    'a' : a, 'g' : g, 'v' : v, 'e' : e, 'Vp': round(vp),
-                    'Va' : round(va),'Vg' : round(vg),'Vv' : round(vv),
-                    'Ve' : round(ve)}]
-        
-        sys_results = pd.DataFrame(sys_results)
+        sys_results = {'Element' : 'System', 'Area' : round(area),
+                       'a' : a, 'g' : g, 'v' : v, 'e' : e, 'Vp': round(vp),
+                       'Va' : round(va),'Vg' : round(vg),'Vv' : round(vv),
+                       'Ve' : round(ve)}
         
-        # df_layout dropped
-        sys_results = pd.concat([*study_areas, sys_results],
-                                join= "inner", ignore_index=True)
+        # columns present in all outputs and in the row of the system
+        columns = [c for c in COLUMNS if c in sys_results and
+                   all(isinstance(df, (ResultTable, ElementResult)) or
+                       c in df.columns for df in study_areas)]
         
-
         # delete column e and ve if all column is zero
+        if not np.any(table.array(['e']) != 0):
+            columns = [c for c in columns if c not in ('e', 'Ve')]
+        
+        if totals_only:
+            import pandas as pd
+            return pd.DataFrame([sys_results], columns=columns)
         
-        if (True in (sys_results.e.values != 0)) == False:
-            sys_results = sys_results.drop(columns = ["e"])
-            sys_results = sys_results.drop(columns = ["Ve"])
+        table.append(sys_results)
+        sys_results = table.to_frame()[columns]
                     
         return(sys_results)
         
@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 14:26:51 2026
+
+Grid mode: water balance of surface elements for gridded climate data,
+e.g. the multi-annual grids of DWD (see climate.py), in one vectorised
+pass over all cells.
+"""
+
+import gzip
+import numpy as np
+from check_ranges import validMask
+from dwa_a102 import SURFACE_ELEMENTS
+import regressions
+
+
+def read_ascii_grid(path, scale=1.0):
+    '''
+    Reads a grid in ESRI ASCII format (as provided by DWD, optionally
+    gzipped), e.g.
+    https://opendata.dwd.de/climate_environment/CDC/grids_germany/multi_annual/precipitation/
+
+    Parameters
+    ----------
+    path : string
+          file name (.asc or .asc.gz)
+
+    scale : float, optional
+           factor applied to all values (e.g. 0.1 for grids given in 1/10
+           mm). The default is 1.0.
+
+    Returns
+    -------
+    values : 2D array
+            grid values, NaN for cells without data
+
+    header : dict
+            ncols, nrows, xllcorner, yllcorner, cellsize, nodata_value
+    '''
+    opener = gzip.open if path.endswith('.gz') else open
+    header = {}
+    with opener(path, 'rt') as f:
+        for line in f:
+            fields = line.split()
+            if not fields[0][0].isalpha():
+                break
+            header[fields[0].lower()] = float(fields[1])
+
+    values = np.loadtxt(path, skiprows=len(header), dtype=float)
+    values = values.reshape(int(header['nrows']), int(header['ncols']))
+    if 'nodata_value' in header:
+        values[values == header['nodata_value']] = np.nan
+    return values*scale, header
+
+
+def grid_balance(element, p, etp, p_corr_factor=1.0, **params):
+    '''
+    Calculates the partitioning factors of a surface element for every
+    cell of gridded P and ETP.
+
+    Parameters
+    ----------
+    element : string
+             name of the Surface method, e.g. "roof" or "gravel_cover"
+
+    p : 2D array
+       avg. annual precipitation depth (mm/a)
+
+    etp : 2D array
+         avg. annual potential evapotranspiration depth (mm/a)
+
+    p_corr_factor : float, optional
+                   scaling factor to correct precipitation for undercatch.
+                   The default is 1.0.
+
+    **params : float or 2D array
+              parameters of the element (see help of the Surface method)
+
+    Notes
+    ------
+    Cells without data or with P, ETP or parameters outside of their range
+    of validity (see check_ranges.validMask()) are NaN in the results, so
+    a single invalid cell does not stop the whole grid.
+
+    Returns
+    -------
+    results : dict
+             2D arrays of a, g, v and e, and the boolean array 'valid'
+    '''
+    if element not in SURFACE_ELEMENTS:
+        raise Exception(f"{element} is not a surface element."
+                        f" Available: {', '.join(SURFACE_ELEMENTS)}")
+    p = np.asarray(p, dtype=float)*p_corr_factor
+    etp = np.asarray(etp, dtype=float)
+    valid = validMask(element, p=p, etp=etp, **params)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        fractions = getattr(regressions, element)(p, etp, **params)
+
+    results = {}
+    for name, values in zip(('a', 'g', 'v', 'e'), fractions):
+        results[name] = np.where(valid, values, np.nan)
+    results['valid'] = valid
+    return results
@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 20:41:15 2026
+
+Opt-in instrumentation of the methods of StudyArea, watbal() and bagrov():
+call counts, cumulative wall time and (optionally) allocated memory per
+function. Disabled by default, then a wrapped function costs one extra call
+and a check of a global flag.
+
+Example:
+  import instrumentation
+  instrumentation.enable(memory=True)
+  ... run the model ...
+  print(instrumentation.report())
+"""
+
+import functools
+import json
+import time
+import tracemalloc
+
+_enabled = False
+_memory = False
+# name -> [calls, seconds, bytes]
+_stats = {}
+# peaks of memory of the calls in progress (innermost last)
+_peaks = []
+
+
+def instrument(f):
+    '''
+    Decorator recording calls of f while the instrumentation is enabled.
+    The signature and docstring of f are kept (functools.wraps).
+    '''
+    name = f.__qualname__
+
+    @functools.wraps(f)
+    def wrapper(*args, **kwargs):
+        if not _enabled:
+            return f(*args, **kwargs)
+        return _record(name, f, args, kwargs)
+    return wrapper
+
+
+def _record(name, f, args, kwargs):
+    # calls f and adds its time (and peak of allocated memory) to _stats
+    memory = _memory and tracemalloc.is_tracing()
+    if memory:
+        start_bytes, peak = tracemalloc.get_traced_memory()
+        if _peaks:
+            _peaks[-1] = max(_peaks[-1], peak)
+        tracemalloc.reset_peak()
+        _peaks.append(0)
+    start = time.perf_counter()
+    try:
+        return f(*args, **kwargs)
+    finally:
+        seconds = time.perf_counter() - start
+        stats = _stats.setdefault(name, [0, 0.0, 0])
+        stats[0] += 1
+        stats[1] += seconds
+        if memory:
+            # nested calls reset the peak, their peaks are kept in _peaks
+            peak = max(tracemalloc.get_traced_memory()[1], _peaks.pop())
+            stats[2] += peak - start_bytes
+            if _peaks:
+                _peaks[-1] = max(_peaks[-1], peak)
+
+
+def enable(memory=False):
+    '''
+    Starts recording
+
+    Parameters
+    ----------
+    memory : bool, optional
+            if True, the peak of memory allocated during each call is
+            recorded with tracemalloc (which slows down Python
+            considerably). The default is False.
+    '''
+    global _enabled, _memory
+    _enabled = True
+    _memory = memory
+    if memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+
+def disable():
+    ''' stops recording (the statistics are kept until reset()) '''
+    global _enabled, _memory
+    _enabled = False
+    if _memory and tracemalloc.is_tracing():
+        tracemalloc.stop()
+    _memory = False
+
+
+def reset():
+    ''' removes all statistics '''
+    _stats.clear()
+
+
+def summary():
+    '''
+    Statistics of all recorded functions, sorted by cumulative time
+
+    Returns
+    -------
+    summary : list of dict
+             name, calls, seconds (cumulative), us_per_call and bytes (peak
+             of allocated memory summed over all calls, 0 if not recorded)
+    '''
+    rows = [{'name': name, 'calls': calls, 'seconds': seconds,
+             'us_per_call': seconds/calls*1e6, 'bytes': size}
+            for name, (calls, seconds, size) in _stats.items()]
+    return sorted(rows, key=lambda row: row['seconds'], reverse=True)
+
+
+def report(fmt='table'):
+    '''
+    Statistics as text
+
+    Parameters
+    ----------
+    fmt : string, optional
+         'table' or 'json'. The default is 'table'.
+
+    Returns
+    -------
+    report : string
+    '''
+    rows = summary()
+    if fmt == 'json':
+        return json.dumps(rows, indent=1)
+    lines = [f"{'name':<40} {'calls':>8} {'seconds':>10} {'us/call':>10}"
+             f" {'bytes':>12}"]
+    for row in rows:
+        lines.append(f"{row['name']:<40} {row['calls']:>8}"
+                     f" {row['seconds']:>10.4f} {row['us_per_call']:>10.1f}"
+                     f" {row['bytes']:>12}")
+    return '\n'.join(lines)
@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 17:21:08 2026
+
+Monte Carlo uncertainty propagation: the water balance of a system of
+surface elements (and one measure) is evaluated for random samples of the
+climate and of the parameters, in vectorised chunks distributed over a pool
+of processes.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from check_ranges import validMask
+import regressions
+
+QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+
+
+def sample(spec, rng, size):
+    '''
+    Draws samples of a parameter.
+
+    Parameters
+    ----------
+    spec : float, tuple or callable
+          fixed value, distribution given as tuple with the name of a method
+          of numpy.random.Generator and its arguments, e.g.
+          ('uniform', 0.2, 0.5), ('normal', 700, 50) or
+          ('triangular', 1, 2, 4), or a function f(rng, size). Functions
+          have to be defined at module level to be used with processes.
+
+    rng : numpy.random.Generator
+         random number generator
+
+    size : int
+          number of samples
+
+    Returns
+    -------
+    samples : float or 1D array
+    '''
+    if callable(spec):
+        return np.asarray(spec(rng, size), dtype=float)
+    if isinstance(spec, tuple):
+        return getattr(rng, spec[0])(*spec[1:], size=size)
+    return spec
+
+
+def _chunk(args):
+    # water balance of one chunk of samples with its own random stream
+    seed, size, p, etp, p_corr_factor, elements, measure = args
+    rng = np.random.default_rng(seed)
+    p = sample(p, rng, size)*sample(p_corr_factor, rng, size)
+    etp = sample(etp, rng, size)
+    valid = validMask(None, p=p, etp=etp)
+
+    sampled = []
+    for element in elements:
+        element = {k: sample(x, rng, size) if k not in ('method', 'connected')
+                   else x for k, x in element.items()}
+        valid = valid & validMask(element['method'], **{
+            k: x for k, x in element.items() if k not in ('method',
+                                                          'connected')})
+        sampled.append(element)
+    if measure is not None:
+        measure = {k: sample(x, rng, size) if k != 'method' else x
+                   for k, x in measure.items()}
+        valid = valid & validMask(measure['method'], **{
+            k: x for k, x in measure.items() if k != 'method'})
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        fractions = regressions.system_balance(p, etp, sampled, measure)
+    valid = np.broadcast_to(valid, (size,))
+    return [np.broadcast_to(x, (size,))[valid] for x in fractions], \
+        size - np.count_nonzero(valid)
+
+
+def monte_carlo(elements, measure=None, p=800, etp=500, p_corr_factor=1.0,
+                n=100000, chunk_size=50000, seed=None, max_workers=None,
+                quantiles=QUANTILES, return_samples=False):
+    '''
+    Propagates the uncertainty of climate and parameters to the water
+    balance of a system (a, g, v, e as in the last row of watbal()).
+
+    Parameters
+    ----------
+    elements : list of dict
+              surface elements, e.g. {'method': 'roof', 'area': 500,
+              'sp': ('uniform', 0.2, 0.6), 'connected': True}. Connected
+              elements drain to the measure. Areas and parameters may be
+              given as distributions (see sample()).
+
+    measure : dict, optional
+             measure, e.g. {'method': 'infilt_swale', 'kf': ('uniform',
+             10, 100)}. fasm / fasf default to the standard value. The
+             default is None.
+
+    p, etp, p_corr_factor : float, tuple or callable, optional
+                           climate, fixed or as distributions. The defaults
+                           are 800, 500 and 1.0.
+
+    n : int, optional
+       number of samples. The default is 100000.
+
+    chunk_size : int, optional
+                number of samples evaluated at once by a worker. The default
+                is 50000.
+
+    seed : int, optional
+          seed of the random numbers. Every chunk gets its own stream
+          spawned from it, so results do not depend on the number of
+          workers. The default is None.
+
+    max_workers : int, optional
+                 number of processes, 1 evaluates all chunks in this
+                 process. The default is None (number of CPUs).
+
+    quantiles : sequence of float, optional
+               quantiles of the results. The default is QUANTILES.
+
+    return_samples : bool, optional
+                    if True, the samples of a, g, v and e are returned as
+                    well. The default is False.
+
+    Notes
+    ------
+    Samples the scalar methods would reject (P, ETp and parameters outside
+    of their ranges of validity, see check_ranges.validMask()) are discarded
+    and counted in 'n_invalid'.
+
+    Returns
+    -------
+    results : dict
+             quantiles of a, g, v and e (arrays in the order of
+             'quantiles'), 'n_valid' and 'n_invalid'
+    '''
+    if n < 1 or chunk_size < 1:
+        raise Exception(f"n and chunk_size must be at least 1"
+                        f" (n={n}, chunk_size={chunk_size})")
+    seeds = np.random.SeedSequence(seed).spawn(-(-n // chunk_size))
+    sizes = [min(chunk_size, n - i*chunk_size) for i in range(len(seeds))]
+    tasks = [(s, size, p, etp, p_corr_factor, elements, measure)
+             for s, size in zip(seeds, sizes)]
+
+    if max_workers == 1 or len(tasks) == 1:
+        chunks = list(map(_chunk, tasks))
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            chunks = list(executor.map(_chunk, tasks))
+
+    samples = {}
+    for i, name in enumerate(('a', 'g', 'v', 'e')):
+        samples[name] = np.concatenate([c[0][i] for c in chunks])
+    n_invalid = int(sum(c[1] for c in chunks))
+
+    results = {'quantiles': np.asarray(quantiles)}
+    for name, x in samples.items():
+        results[name] = (np.quantile(x, quantiles) if len(x)
+                         else np.full(len(quantiles), np.nan))
+    results['n_valid'] = n - n_invalid
+    results['n_invalid'] = n_invalid
+    if return_samples:
+        results['samples'] = samples
+    return results
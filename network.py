@@ -0,0 +1,389 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 21:17:26 2026
+
+Networks of surfaces and cascaded measures, e.g. rainwater usage
+overflowing into a swale-trench system and then into a pond. Nodes are
+evaluated once each in topological order, and the runoff (Va) and
+connected area (Au) of every node are passed to the measure it drains to.
+SystemModel keeps the results and updates them incrementally when
+parameters change.
+"""
+
+import copy
+import inspect
+from concurrent.futures import ProcessPoolExecutor
+from graphlib import TopologicalSorter
+import os
+import numpy as np
+from dwa_a102 import SURFACE_ELEMENTS, watbal
+from results import COLUMNS, VOLUMES, ElementResult, ResultTable
+
+
+def call_measure(study_area, method, params, au, va):
+    '''
+    Calculates a measure for connected surfaces given by their total
+    connected area au and runoff va, instead of their results.
+
+    Parameters
+    ----------
+    study_area : StudyArea
+                climate of the measure
+
+    method : string
+            name of the Measure method, e.g. "infilt_swale"
+
+    params : dict
+            parameters of the method by name (e.g. {'kf': 42})
+
+    au, va : float
+            connected area (m2) and runoff volume (m3/a) of the connected
+            surfaces
+
+    Returns
+    -------
+    result : ElementResult
+            row of the measure
+    '''
+    f = getattr(study_area, method)
+    args, kwargs = [], {}
+    for name, param in inspect.signature(f).parameters.items():
+        if param.kind is inspect.Parameter.VAR_POSITIONAL:
+            # the connected surfaces are passed as one row
+            args.append({'Element': 'Connected surfaces', 'Au': au, 'Va': va})
+        elif param.kind is inspect.Parameter.KEYWORD_ONLY:
+            if name in params:
+                kwargs[name] = params[name]
+        elif name in params:
+            args.append(params[name])
+        else:
+            raise Exception(f"{name} is missing for {method}")
+    results = f(*args, **kwargs)
+    if not isinstance(results, ResultTable):
+        # as_frame=True or drainage with wrong input
+        raise Exception(f"{method} did not return results: {results}")
+    return ElementResult(*[results.last(c) for c in COLUMNS])
+
+
+def system_row(volumes):
+    '''
+    Row of the system in watbal() from the sums of VOLUMES (Area, Vp, Va,
+    Vg, Vv, Ve) of all elements
+    '''
+    area, vp, va, vg, vv, ve = np.asarray(volumes, dtype=float).tolist()
+    return {'Element' : 'System', 'Area' : round(area),
+            'a' : round(va/vp, 3), 'g' : round(vg/vp, 3),
+            'v' : round(vv/vp, 3), 'e' : round(ve/vp, 3),
+            'Vp': round(vp), 'Va' : round(va), 'Vg' : round(vg),
+            'Vv' : round(vv), 'Ve' : round(ve)}
+
+
+class Network(object):
+    '''
+    Surfaces and measures as nodes of a directed acyclic graph. Every node
+    drains to at most one measure. Results are taken from a ResultCache
+    (see cache.py), if given.
+
+    Example:
+      net = Network(StudyArea(700, 575))
+      net.add('roof', 'roof', area=500, sp=0.3)
+      net.add('cistern', 'rainwater_usage', ['roof'], vsp=50, vbr=1,
+              fabw=2, qbw=60)
+      net.add('swale', 'infilt_swale', ['cistern'], kf=42)
+      net.watbal()
+    '''
+
+    def __init__(self, study_area, cache=None):
+        # nodes are evaluated with compact results
+        self.study_area = copy.copy(study_area)
+        self.study_area.as_frame = False
+        self.cache = cache
+        self.nodes = {}
+        self.inputs = {}
+        self.outlet = {}
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def __repr__(self):
+        return f"Network with {len(self.nodes)} nodes"
+
+    def add(self, name, method, inputs=(), **params):
+        '''
+        Adds a surface or measure
+
+        Parameters
+        ----------
+        name : string
+              unique name of the node
+
+        method : string
+                name of the Surface or Measure method, e.g. "roof" or
+                "swale_trench_system"
+
+        inputs : list of string, optional
+                names of the nodes draining to this measure (surfaces have
+                no inputs). The default is ().
+
+        **params :
+                  parameters of the method by name, including area for
+                  surfaces and except the connected surfaces for measures
+        '''
+        if name in self.nodes:
+            raise Exception(f"Node {name} already exists")
+        if not hasattr(self.study_area, method):
+            raise Exception(f"Unknown method {method}")
+        if method in SURFACE_ELEMENTS and inputs:
+            raise Exception(f"Surface {name} cannot have inputs")
+        for node in inputs:
+            if node not in self.nodes:
+                raise Exception(f"Unknown input {node} of {name}")
+            if node in self.outlet:
+                raise Exception(f"{node} already drains to"
+                                f" {self.outlet[node]}")
+        for node in inputs:
+            self.outlet[node] = name
+        self.nodes[name] = (method, params)
+        self.inputs[name] = tuple(inputs)
+        return name
+
+    def order(self):
+        ''' names of the nodes in topological order (inputs first) '''
+        return list(TopologicalSorter(self.inputs).static_order())
+
+    def evaluate_node(self, name, results):
+        '''
+        Results of a node, given the results of its inputs
+
+        Parameters
+        ----------
+        name : string
+              name of the node
+
+        results : dict
+                 name -> ElementResult of (at least) the inputs of the node
+
+        Returns
+        -------
+        result : ElementResult
+        '''
+        method, params = self.nodes[name]
+        if method in SURFACE_ELEMENTS:
+            if self.cache is not None:
+                return self.cache.evaluate(self.study_area, method, params)
+            return getattr(self.study_area, method)(**params)
+        au = sum(results[node].Au for node in self.inputs[name])
+        va = sum(results[node].Va for node in self.inputs[name])
+        if self.cache is not None:
+            return self.cache.evaluate(self.study_area, method, params, au,
+                                       va)
+        return call_measure(self.study_area, method, params, au, va)
+
+    def evaluate(self):
+        '''
+        Evaluates all nodes once in topological order
+
+        Returns
+        -------
+        results : dict
+                 name -> ElementResult of every node
+        '''
+        results = {}
+        for name in self.order():
+            results[name] = self.evaluate_node(name, results)
+        return results
+
+    def table(self, results=None):
+        '''
+        ResultTable of all nodes, runoff of nodes draining to a measure is
+        set to zero (it is passed on to the measure)
+        '''
+        if results is None:
+            results = self.evaluate()
+        table = ResultTable()
+        for name in self.nodes:
+            row = results[name]
+            if name in self.outlet:
+                row = row._replace(Va=0)
+            table.append(row)
+        return table
+
+    def watbal(self, totals_only=False):
+        '''
+        Water balance of the network, see watbal(). Rows are indexed by the
+        names of the nodes.
+        '''
+        results = watbal(self.table(), totals_only=totals_only)
+        if not totals_only:
+            results.index = list(self.nodes) + ['System']
+        return results
+
+    def volumes(self):
+        ''' sums of VOLUMES (Area, Vp, Va, Vg, Vv, Ve) of the network '''
+        return self.table().array(VOLUMES).sum(axis=0)
+
+
+class SystemModel(Network):
+    '''
+    Network keeping the results of all nodes and the volumes of the system.
+    When parameters of a node change, only this node and the measures
+    downstream of it are recomputed and the volumes of the system are
+    corrected by the differences.
+
+    Example:
+      model = SystemModel(StudyArea(700, 575))
+      model.add('roof', 'roof', area=500, sp=0.3)
+      model.add('swale', 'infilt_swale', ['roof'], kf=42)
+      model.system()
+      model.update('roof', sp=0.5)
+      model.system()
+    '''
+
+    def __init__(self, study_area, cache=None):
+        super().__init__(study_area, cache)
+        self.results = None
+        # sums of VOLUMES over all nodes (Va only of nodes not drained)
+        self.totals = None
+        # number of evaluated nodes since creation
+        self.evaluations = 0
+
+    def add(self, name, method, inputs=(), **params):
+        name = super().add(name, method, inputs, **params)
+        self.results = None
+        return name
+    add.__doc__ = Network.add.__doc__
+
+    def _volumes(self, name):
+        # volumes of a node as counted in the water balance of the system
+        row = self.results[name]
+        return np.array([0 if c == 'Va' and name in self.outlet
+                         else getattr(row, c) for c in VOLUMES], dtype=float)
+
+    def evaluate_node(self, name, results):
+        self.evaluations += 1
+        return super().evaluate_node(name, results)
+    evaluate_node.__doc__ = Network.evaluate_node.__doc__
+
+    def evaluate(self):
+        '''
+        Results of all nodes, evaluated only if nodes were added since the
+        last evaluation
+
+        Returns
+        -------
+        results : dict
+                 name -> ElementResult of every node
+        '''
+        if self.results is None:
+            self.results = super().evaluate()
+            self.totals = np.sum([self._volumes(name) for name in
+                                  self.nodes], axis=0)
+        return self.results
+
+    def update(self, name, **params):
+        '''
+        Changes parameters of a node and recomputes the node and the
+        measures downstream (as long as their inputs change)
+
+        Parameters
+        ----------
+        name : string
+              name of the node
+
+        **params :
+                  new values of parameters of the method
+
+        Returns
+        -------
+        result : ElementResult
+                new results of the node
+        '''
+        self.evaluate()
+        method, old_params = self.nodes[name]
+        self.nodes[name] = (method, dict(old_params, **params))
+        try:
+            result = self.evaluate_node(name, self.results)
+        except Exception:
+            self.nodes[name] = (method, old_params)
+            raise
+
+        node = name
+        while node is not None:
+            before = self.results[node]
+            volumes = self._volumes(node)
+            self.results[node] = result
+            self.totals += self._volumes(node) - volumes
+            node = self.outlet.get(node)
+            if node is None or (result.Au == before.Au and
+                                result.Va == before.Va):
+                break
+            result = self.evaluate_node(node, self.results)
+        return self.results[name]
+
+    def system(self):
+        '''
+        Water balance of the system from the kept volumes, as in the last
+        row of watbal()
+
+        Returns
+        -------
+        results : dict
+                 Area, a, g, v, e and the volumes Vp, Va, Vg, Vv, Ve
+        '''
+        self.evaluate()
+        return system_row(self.totals)
+
+
+def _volumes(networks):
+    # volumes of a batch of networks, evaluated in a worker
+    return np.array([network.volumes() for network in networks])
+
+
+def evaluate_parallel(networks, max_workers=None, batch_size=None):
+    '''
+    Evaluates independent subcatchments in a pool of processes
+
+    Parameters
+    ----------
+    networks : list of Network
+              subcatchments, e.g. surfaces connected to one measure each
+
+    max_workers : int, optional
+                 number of processes, 1 evaluates all networks in this
+                 process. The default is None (number of CPUs).
+
+    batch_size : int, optional
+                number of networks sent to a worker at once. The default is
+                None (about four batches per worker).
+
+    Notes
+    ------
+    Workers only return the sums of VOLUMES of each network (one row of
+    six numbers), which are added up at once for the whole system.
+
+    Returns
+    -------
+    volumes : 2D array
+             Area, Vp, Va, Vg, Vv, Ve (columns) of every network (rows)
+
+    system : dict
+            water balance of all networks, as in the last row of watbal()
+    '''
+    networks = list(networks)
+    workers = max_workers or os.cpu_count() or 1
+    if batch_size is None:
+        batch_size = max(1, -(-len(networks) // (4*workers)))
+    batches = [networks[i:i + batch_size]
+               for i in range(0, len(networks), batch_size)]
+
+    if workers == 1 or len(batches) == 1:
+        volumes = list(map(_volumes, batches))
+    else:
+        # workers open the file of a ResultCache again, see its results
+        for cache in {id(n.cache): n.cache for n in networks
+                      if n.cache is not None}.values():
+            cache.commit()
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            volumes = list(executor.map(_volumes, batches))
+    volumes = np.concatenate(volumes)
+    return volumes, system_row(volumes.sum(axis=0))
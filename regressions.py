@@ -0,0 +1,275 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 09:12:40 2026
+
+Regression equations of DWA-A102 for the surface elements. All functions
+accept floats or numpy arrays (broadcast against each other) for the
+climate (p, etp) and the element parameters and return the partitioning
+factors a, g, v and e. The functions only depend on numpy; range checks
+and result tables are handled in dwa_a102.py.
+"""
+
+import numpy as np
+
+# version of the model, to be increased whenever results change (e.g. new
+# coefficients), so that stored results (see cache.py) are not reused
+MODEL_VERSION = 1
+
+
+#%% Surfaces (Berechnungsansätze A.1 - A.10)
+
+def garden(p, etp, a=0.2, g=0.2, v=0.6):
+    ''' partitioning factors for green areas, gardens (A.1) '''
+    return a, g, v, 0*a
+
+
+def roof(p, etp, sp=0.3):
+    ''' partitioning factors for steep roofs and smooth flat roofs (A.2) '''
+    a = 0.9115 + 0.00007063*p - 0.000007498*etp - 0.2063*np.log(sp + 1)
+    return a, 0*a, 1 - a, 0*a
+
+
+def flat_area(p, etp, sp=1):
+    ''' partitioning factors for flat roofs, asphalt, concrete (A.3) '''
+    a = 0.8658 + 0.0001659*p - 0.00009945*etp - 0.1542*np.log(sp + 1)
+    return a, 0*a, 1 - a, 0*a
+
+
+def green_roof(p, etp, h, fg=1.0, AWC=0.5):
+    ''' partitioning factors for green roofs (A.4, March 2022) '''
+    a = -8.3518 - 0.2455*fg - 0.1095*np.log(h) - 0.05748/AWC - \
+        0.4256*AWC + 1.781*np.log(p) - 0.002133 * p + \
+        7.7488E-7 * (p - etp)**2 - 0.0005051 * etp
+    return a, 0*a, 1 - a, 0*a
+
+
+def green_roof_shallow(p, etp):
+    ''' partitioning factors for shallow green roofs < 4 cm '''
+    a = -1.327185 + -0.000066 * p + -0.000398 * etp + 0.336548 * np.log(p) \
+        + -3.050779e-08 * (p - etp)**2
+    return a, 0*a, 1 - a, 0*a
+
+
+def storage_roof(p, etp, sp=5):
+    ''' partitioning factors for storage roofs (A.5) '''
+    a = 0.9231 + 0.000254*p - 0.0003226*etp - 0.1472*np.log(sp + 1)
+    return a, 0*a, 1 - a, 0*a
+
+
+def permeable_surface(p, etp, fa, kf, sp=1, wkmax_wp=0.15):
+    '''
+    partitioning factors for partially permeable surfaces, joint ratio
+    2 % to 5 % (A.6) and 6 % to 10 % (A.7)
+    '''
+    # A.6: joint ratio 2 % to 5 %
+    a_6 = (0.0800734*np.log(p) - 0.0582828*fa - 0.0501693*sp
+           - 0.385767*wkmax_wp + (8.7040284/(11.9086896 + kf)))
+    v_6 = (0.8529 - 0.1248*np.log(p) + 0.00005057*etp + 0.002372*fa
+           + 0.1583*np.log(1 + sp))
+    # A.7: joint ratio 6 % to 10 %
+    a_7 = (0.05912*np.log(p) - 0.02749*fa - 0.03671*sp
+           - 0.30514*wkmax_wp + (4.97687/(4.7975 + kf)))
+    v_7 = (0.9012 - 0.1325*np.log(p) + 0.00006661*etp + 0.002302*fa
+           + 0.1489*np.log(1 + sp))
+    a = np.where(fa <= 5, a_6, a_7)
+    v = np.where(fa <= 5, v_6, v_7)
+    # To fullfill the conservation mass (a+g+v=1)
+    g = 1 - a - v
+    return a, g, v, 0*a
+
+
+def porous_surface(p, etp, sp=3.5, h=100, kf=180):
+    ''' partitioning factors for porous surfaces, gravel lawn (A.8) '''
+    a = (0.000001969*p - 0.005116*np.log(sp) - 0.0001051*h
+         + 0.01753*np.exp(4.576/kf))
+    v = (0.2111 - 0.2544*np.log(p) + 0.2073*np.log(etp)
+         + 0.0006249*sp + 0.123*np.log(h) - 0.000002806*kf)
+    g = np.maximum(1 - (a + v), 0.0)
+    return a, g, v, 0*a
+
+
+def paver_stonegrid(p, etp, fa=25, sp=1, wkmax_wp=0.15):
+    ''' partitioning factors for paver stone grids (A.9) '''
+    a = (0.145704 - 0.059177*np.log(fa) - 0.007354*sp
+         - 0.050531*np.log(wkmax_wp))
+    v = (1.106 - 0.1625*np.log(p) + 0.0001282*etp
+         + 0.1131*np.log(1 + sp) + 0.2848*wkmax_wp)
+    g = np.maximum(1 - (a + v), 0.0)
+    return a, g, v, 0*a
+
+
+def gravel_cover(p, etp, h=100, sp=3.5, kf=1.8):
+    ''' partitioning factors for gravel covers (A.10) '''
+    a = 0.00004517*p - 0.03454*np.log(sp) + (0.1958/(0.2873 + kf))
+    v = (0.2111 - 0.2544*np.log(p) + 0.2073*np.log(etp)
+         + 0.0006249*sp + 0.123*np.log(h) - 0.000002806*kf)
+    g = np.maximum(1 - (a + v), 0.0)
+    return a, g, v, 0*a
+
+
+#%% Measures (Berechnungsansätze B.2 - B.7)
+
+def surf_infiltration_fasf(kf):
+    ''' standard percentage of infiltration area of surface infiltration '''
+    return 94741*kf**(-1.195)
+
+
+def surf_infiltration_fasf_range(kf):
+    ''' range of validity of the percentage of infiltration area (fasf) '''
+    return 66394*kf**(-1.197), 70910*kf**(-1.117)
+
+
+def surf_infiltration(p, etp, kf, fasf):
+    ''' partitioning factors for surface infiltration (B.2) '''
+    a = 0.004264 + 0.001121*np.log(p) - 0.002757*np.log(fasf)
+    v = 0.3999 - 0.09317*np.log(p) + 0.00009746*etp + 0.07474*np.log(fasf)
+    g = np.maximum(1 - (a + v), 0.0)
+    return a, g, v, 0*a
+
+
+def infilt_swale_fasm(kf):
+    ''' standard percentage of infiltration area of infiltration swales '''
+    return 42.323*kf**(-0.314)
+
+
+def infilt_swale_fasm_range(kf):
+    ''' range of validity of the percentage of infiltration area (fasm) '''
+    return 27.14*kf**(-0.303), 62.414*kf**(-0.328)
+
+
+def infilt_swale(p, etp, kf, fasm):
+    ''' partitioning factors for infiltration swales (B.3) '''
+    g = (0.8608 + 0.02385*np.log(p) - 0.00005331*etp - 0.002827*fasm
+         - 0.000002493*kf + 0.0009514*np.log(kf/fasm))
+    v = 0.000008562*etp + (2.611/(p - 64.35))*fasm**0.9425 - 0.000001211*kf
+    # To force positive values or zero
+    a = np.maximum(1 - (g + v), 0.0)
+    return a, g, v, 0*a
+
+
+def swale_trench_fasm(kf):
+    ''' standard percentage of infiltration area of swale-trench elements '''
+    return 21.86*kf**(-0.348)
+
+
+def swale_trench_fasm_range(kf):
+    ''' range of validity of the percentage of infiltration area (fasm) '''
+    return 14.608*kf**(-0.406), 47.634*kf**(-0.438)
+
+
+def swale_trench(p, etp, kf, fasm):
+    ''' partitioning factors for swale-trench elements (B.4) '''
+    a = (-0.03867 + 0.007684*np.log(p) + 0.000003201*fasm + 0.0002564*kf
+         - 0.0001187*fasm*kf + 0.004161*np.log(kf/fasm))
+    v = 0.000008879*etp + (2.528/(p - 81.65))*fasm**0.9496 - 0.00007768*kf
+    g = np.maximum(1 - (a + v), 0.0)
+    return a, g, v, 0*a
+
+
+def swale_trench_system_fasm(qdr, kf):
+    ''' standard percentage of infiltration area of swale-trench systems '''
+    return 11.79 - 3.14*np.log(qdr) - 0.18594*kf
+
+
+def swale_trench_system(p, etp, qdr, kf, fasm):
+    ''' partitioning factors for swale-trench systems (B.5) '''
+    a = (0.8112 + 0.0003473*p - 0.00001845*etp - 0.04793*fasm
+         + 0.0007481*qdr - 0.4389*np.log(kf + 1))
+    v = (0.1428 - 0.02661*np.log(p) + 0.00005668*etp + 0.0288*np.log(fasm)
+         - 0.0001825*qdr - 0.01823*np.log(kf + 1))
+    g = np.maximum(1 - (a + v), 0.0)
+    return a, g, v, 0*a
+
+
+def rainwater_usage(p, etp, vsp, vbr, fabw, qbw):
+    ''' partitioning factors for rainwater usage (B.6) '''
+    VBw = fabw*qbw
+    Vnmin = np.minimum(p, 365*vbr + VBw)
+    # no irrigation: v = 0, no usage: e = 0
+    with np.errstate(divide='ignore'):
+        v = np.where(VBw == 0, 0.0,
+                     - 0.0001927*p + 0.0001831*etp + 0.0006083*VBw
+                     - 0.0000003127*VBw**2 - 0.3092*np.exp(3.269/vsp)
+                     + (1.424/(2.782 + vbr)) + 0.0001885*Vnmin)
+        e = np.where(vbr == 0, 0.0,
+                     0.4451 - 0.0003529*p - 0.00007728*etp
+                     + 0.06821*np.log10(vsp) - 0.0002507*VBw
+                     + 0.2349*np.log10(vbr) + 0.0001738*Vnmin)
+    a = np.maximum(1 - (v + e), 0.0)
+    return a, 0*a, v, e
+
+
+def pond_system(p, etp, aw, au):
+    ''' partitioning factors for ponds with permanent storage (B.7) '''
+    v = (etp*aw)/(p*(aw + au))
+    a = 1 - v
+    return a, 0*a, v, 0*a
+
+
+#%% Water balance of a system of surfaces and one measure
+
+def _measure(method, p, etp, au, params):
+    # partitioning factors and area of a measure with connected area au
+    kernel = globals()[method]
+    if method == 'pond_system':
+        return kernel(p, etp, params['aw'], au), params['aw']
+    if method == 'rainwater_usage':
+        return kernel(p, etp, **params), 0
+    fa = 'fasf' if method == 'surf_infiltration' else 'fasm'
+    params = dict(params)
+    if params.get(fa, f'{fa}_standard') == f'{fa}_standard':
+        standard = globals()[f'{method}_{fa}']
+        params[fa] = standard(**{k: params[k] for k in ('qdr', 'kf')
+                                 if k in params})
+    return kernel(p, etp, **params), au*params[fa]/100
+
+
+def system_balance(p, etp, elements, measure=None):
+    '''
+    Partitioning factors of a system of surface elements, some of them
+    connected to one measure, as in watbal() but without rounding of the
+    volumes. All inputs may be arrays (e.g. samples), which are broadcast.
+
+    Parameters
+    ----------
+    p, etp : float or array
+            precipitation and potential evapotranspiration (mm/a)
+
+    elements : list of dict
+              surface elements, with the name of the method ('method'), the
+              area ('area'), optionally 'connected' (True if the element
+              drains to the measure) and the parameters of the method
+
+    measure : dict, optional
+             measure with the name of the method ('method') and its
+             parameters (except the connected surfaces). The default is
+             None.
+
+    Returns
+    -------
+    a, g, v, e : float or array
+    '''
+    vp, va, vg, vv, ve = 0, 0, 0, 0, 0
+    au, va_in = 0, 0
+    for element in elements:
+        params = {k: x for k, x in element.items()
+                  if k not in ('method', 'area', 'connected')}
+        a, g, v, e = globals()[element['method']](p, etp, **params)
+        vp_i = element['area']*p/1000
+        vp, vg, vv, ve = vp + vp_i, vg + vp_i*g, vv + vp_i*v, ve + vp_i*e
+        if measure is not None and element.get('connected', False):
+            au = au + element['area']*a
+            va_in = va_in + vp_i*a
+        else:
+            va = va + vp_i*a
+
+    if measure is not None:
+        params = {k: x for k, x in measure.items() if k != 'method'}
+        (a, g, v, e), area = _measure(measure['method'], p, etp, au, params)
+        vp_m = area*p/1000
+        inflow = vp_m + va_in
+        vp = vp + vp_m
+        va, vg, vv, ve = (va + inflow*a, vg + inflow*g, vv + inflow*v,
+                          ve + inflow*e)
+
+    return va/vp, vg/vp, vv/vp, ve/vp
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 11:03:17 2026
+
+Containers for the results of surfaces and measures of dwa_a102.py.
+pandas is only imported when results are converted to DataFrames.
+"""
+
+from collections import namedtuple
+import numpy as np
+
+# columns of the results of surfaces and measures
+COLUMNS = ['Element', 'Area', 'Au', 'P', 'Etp', 'a', 'g', 'v', 'e', 'Vp',
+           'Va', 'Vg', 'Vv', 'Ve']
+
+# columns summed up for the water balance of a system
+VOLUMES = ['Area', 'Vp', 'Va', 'Vg', 'Vv', 'Ve']
+
+
+class ElementResult(namedtuple('ElementResult', COLUMNS)):
+    '''
+    Results of a single element as a compact, immutable record (fields as
+    in COLUMNS, e.g. result.Va). Needs a fraction of the memory of a
+    DataFrame with one row and is converted with to_frame() when needed.
+    '''
+    __slots__ = ()
+
+    def to_frame(self):
+        ''' converts the record to a DataFrame with one row '''
+        import pandas as pd
+        return pd.DataFrame([self], columns=COLUMNS)
+
+
+class ResultTable(object):
+    '''
+    Accumulator for results of surfaces and measures. Rows are collected
+    column by column in lists (adding a surface costs time proportional to
+    its number of rows) and turned into a DataFrame only when to_frame() is
+    called.
+    '''
+
+    def __init__(self, columns=None):
+        self.columns = {c: [] for c in COLUMNS}
+        if columns is not None:
+            self.columns.update(columns)
+
+    def __len__(self):
+        return len(self.columns['Element'])
+
+    def __repr__(self):
+        return repr(self.to_frame())
+
+    def _repr_html_(self):
+        return self.to_frame()._repr_html_()
+
+    def append(self, results):
+        '''
+        Adds results at the end of the table
+
+        Parameters
+        ----------
+        results : DataFrame, ResultTable, ElementResult or dict
+                 outputs of methods from StudyArea (Surfaces, Measures) or a
+                 single row given as dict
+        '''
+        if isinstance(results, ResultTable):
+            for c in COLUMNS:
+                self.columns[c].extend(results.columns[c])
+        elif isinstance(results, ElementResult):
+            for c, value in zip(COLUMNS, results):
+                self.columns[c].append(value)
+        elif isinstance(results, dict):
+            for c in COLUMNS:
+                self.columns[c].append(results.get(c, np.nan))
+        elif list(results.columns) == COLUMNS:
+            # usual layout, all columns converted at once
+            for c, values in zip(COLUMNS, results.to_numpy().T.tolist()):
+                self.columns[c].extend(values)
+        else:
+            n = len(results)
+            for c in COLUMNS:
+                self.columns[c].extend(results[c].tolist() if c in results
+                                       else [np.nan]*n)
+
+    def last(self, column):
+        ''' value of a column in the last row '''
+        return self.columns[column][-1]
+
+    def array(self, columns):
+        ''' numeric columns as 2D numpy array, one row per result '''
+        return np.array([self.columns[c] for c in columns], dtype=float).T
+
+    def to_frame(self):
+        ''' converts the table to a DataFrame '''
+        import pandas as pd
+        return pd.DataFrame(self.columns, columns=COLUMNS)
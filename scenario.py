@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 22:04:39 2026
+
+Scenario files (JSON or TOML) describing the climate, the elements and
+their connections to measures, e.g.
+
+  [climate]
+  p = 700
+  etp = 575
+  p_corr_factor = 1.1     # optional
+  # location = "Hannover" (optional, instead of p and etp)
+
+  [[nodes]]
+  name = "roof"
+  method = "roof"
+  area = 500
+  sp = 0.3
+
+  [[nodes]]
+  name = "swale"
+  method = "infilt_swale"
+  inputs = ["roof"]
+  kf = 42
+
+Scenarios are loaded into a SystemModel (see network.py). scenario_hash()
+identifies scenarios by their content, independent of the order of nodes
+and keys, formatting and int/float notation.
+"""
+
+import hashlib
+import inspect
+import json
+from graphlib import TopologicalSorter
+from dwa_a102 import StudyArea
+from network import SystemModel
+
+# version of the scenario format, part of the hash
+FORMAT_VERSION = 1
+
+# keys of the climate table and their defaults
+CLIMATE = {'p': 800, 'etp': 500, 'p_corr_factor': 1.0, 'location': None}
+
+
+def read_scenario(path):
+    ''' reads a scenario from a .json or .toml file and returns a dict '''
+    if path.endswith('.toml'):
+        import tomllib
+        with open(path, 'rb') as f:
+            return tomllib.load(f)
+    with open(path) as f:
+        return json.load(f)
+
+
+def _normalize(value):
+    # numbers as float, so that 500 and 500.0 are the same scenario
+    if isinstance(value, bool) or value is None or isinstance(value, str):
+        return value
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, (list, tuple)):
+        return [_normalize(x) for x in value]
+    raise Exception(f"Unsupported value in scenario: {value!r}")
+
+
+def canonical(scenario):
+    '''
+    Canonical form of a scenario: defaults of the climate and of the
+    methods filled in, numbers as floats, nodes sorted by name and their
+    inputs sorted
+
+    Parameters
+    ----------
+    scenario : dict
+              scenario as read by read_scenario()
+
+    Returns
+    -------
+    scenario : dict
+    '''
+    unknown = set(scenario) - {'climate', 'nodes'}
+    if unknown:
+        raise Exception(f"Unknown keys in scenario: {', '.join(unknown)}")
+    climate = dict(CLIMATE)
+    for key, value in scenario.get('climate', {}).items():
+        if key not in CLIMATE:
+            raise Exception(f"Unknown key in climate: {key}")
+        climate[key] = value
+    if climate['location'] is not None:
+        # p and etp are taken from the location
+        climate['p'], climate['etp'] = None, None
+
+    nodes = []
+    for node in scenario.get('nodes', []):
+        if 'name' not in node or 'method' not in node:
+            raise Exception(f"Nodes need a name and a method: {node}")
+        if not hasattr(StudyArea, node['method']):
+            raise Exception(f"Unknown method {node['method']}")
+        signature = inspect.signature(getattr(StudyArea, node['method']))
+        node = dict({name: param.default for name, param
+                     in signature.parameters.items()
+                     if param.default is not inspect.Parameter.empty}, **node)
+        node = {k: _normalize(v) for k, v in node.items()}
+        node['inputs'] = sorted(node.get('inputs', []))
+        nodes.append(node)
+    nodes.sort(key=lambda node: node['name'])
+
+    return {'version': FORMAT_VERSION,
+            'climate': {k: _normalize(v) for k, v in climate.items()},
+            'nodes': nodes}
+
+
+def scenario_hash(scenario):
+    '''
+    SHA-256 of the canonical form of a scenario (hex string), equal for
+    scenarios with the same content
+    '''
+    text = json.dumps(canonical(scenario), sort_keys=True,
+                      separators=(',', ':'))
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def load_scenario(scenario):
+    '''
+    Builds the system of a scenario
+
+    Parameters
+    ----------
+    scenario : string or dict
+              file name (.json or .toml) or scenario as dict
+
+    Returns
+    -------
+    model : SystemModel
+           nodes of the scenario, not evaluated yet
+    '''
+    if isinstance(scenario, str):
+        scenario = read_scenario(scenario)
+    climate = canonical(scenario)['climate']
+    study_area = StudyArea(climate['p'], climate['etp'],
+                           location=climate['location'],
+                           p_corr_factor=climate['p_corr_factor'])
+
+    nodes = {node['name']: node for node in scenario.get('nodes', [])}
+    if len(nodes) < len(scenario.get('nodes', [])):
+        raise Exception("Names of nodes are not unique")
+    graph = {name: node.get('inputs', []) for name, node in nodes.items()}
+    model = SystemModel(study_area)
+    for name in TopologicalSorter(graph).static_order():
+        if name not in nodes:
+            raise Exception(f"Unknown input {name}")
+        params = {k: v for k, v in nodes[name].items()
+                  if k not in ('name', 'method', 'inputs')}
+        model.add(name, nodes[name]['method'], nodes[name].get('inputs', ()),
+                  **params)
+    return model
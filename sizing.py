@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 18:05:44 2026
+
+Sizing of measures: finds the percentage of infiltration area (fasm / fasf)
+of a measure that brings the water balance of the system (connected
+surfaces and the measure) closest to the natural water balance, e.g. as
+estimated by StudyArea.natural_wb_guess().
+"""
+
+import numpy as np
+from check_ranges import validRange
+from dwa_a102 import _connect
+from results import VOLUMES
+import regressions
+
+# measures that can be sized and their sizing factor
+SIZING = {'surf_infiltration': 'fasf', 'infilt_swale': 'fasm',
+          'swale_trench': 'fasm'}
+
+# inverse of the golden ratio
+_INVPHI = (np.sqrt(5) - 1)/2
+
+
+def _deviation(fa, p, etp, kf, method, totals, au, va, target, weights):
+    # weighted squared deviation of the system's v, a, g from the target
+    area = au*fa/100
+    vp_m = area*p/1000
+    inflow = vp_m + va
+    a, g, v, e = getattr(regressions, method)(p, etp, kf, fa)
+    vp = totals['Vp'] + vp_m
+    shares = ((totals['Vv'] + inflow*v)/vp, (totals['Va'] + inflow*a)/vp,
+              (totals['Vg'] + inflow*g)/vp)
+    return sum(w*(x - t)**2 for w, x, t in zip(weights, shares, target)), \
+        shares
+
+
+def size_measure(study_area, method, kf, *surfaces, target,
+                 unconnected=(), weights=(1.0, 1.0, 1.0), n_scan=64,
+                 xtol=1e-6):
+    '''
+    Finds the percentage of infiltration area of a measure which minimises
+    the deviation between the water balance of the system and a target.
+
+    Parameters
+    ----------
+    study_area : StudyArea
+                climate (P, ETP) of the site
+
+    method : string
+            "surf_infiltration", "infilt_swale" or "swale_trench"
+
+    kf : float
+        hydraulic conductivity (mm/h)
+
+    *surfaces : DataFrame
+               outputs of the surfaces connected to the measure
+
+    target : tuple of float
+            natural evapotranspiration, direct runoff and groundwater
+            recharge (ETR, Rd, GWR), e.g. as returned by natural_wb_guess().
+            Only the shares of their sum are used.
+
+    unconnected : tuple of DataFrame, optional
+                 outputs of further surfaces of the system which are not
+                 connected to the measure. The default is ().
+
+    weights : tuple of float, optional
+             weights of the squared deviations of v, a and g. The default
+             is (1.0, 1.0, 1.0).
+
+    n_scan : int, optional
+            number of sizes evaluated at once to bracket the minimum. The
+            default is 64.
+
+    xtol : float, optional
+          tolerance of the percentage of infiltration area (%). The default
+          is 1e-6.
+
+    Notes
+    ------
+    The search is restricted to the range of validity of fasm / fasf for
+    the given kf (see the help of the measure). The minimum is bracketed by
+    a vectorised scan of this range and refined by golden-section search.
+    Volumes are not rounded, hence they may slightly differ from watbal().
+
+    Returns
+    -------
+    results : dict
+             optimal percentage of infiltration area ('fasm' or 'fasf'),
+             the resulting shares 'v', 'a' and 'g' of the system and the
+             weighted squared 'deviation'
+    '''
+    if method not in SIZING:
+        raise Exception(f"{method} cannot be sized."
+                        f" Available: {', '.join(SIZING)}")
+    validRange(kf, f'kf_{method}')
+    p, etp = study_area.p, study_area.etp
+
+    # volumes of the system without the measure
+    previous_results, au, va = _connect(surfaces)
+    for df in unconnected:
+        previous_results.append(df)
+    totals = dict(zip(VOLUMES, previous_results.array(VOLUMES).sum(axis=0)))
+    target = np.asarray(target, dtype=float)
+    target = target/target.sum()
+    args = (p, etp, kf, method, totals, au, va, target, weights)
+
+    # bracket the minimum on a grid spanning the range of validity
+    low, high = getattr(regressions, f'{method}_{SIZING[method]}_range')(kf)
+    grid = np.linspace(low, high, n_scan)
+    i = int(np.argmin(_deviation(grid, *args)[0]))
+    x0, x3 = grid[max(i - 1, 0)], grid[min(i + 1, n_scan - 1)]
+
+    # golden-section search within the bracket
+    x1 = x3 - _INVPHI*(x3 - x0)
+    x2 = x0 + _INVPHI*(x3 - x0)
+    f1, f2 = _deviation(x1, *args)[0], _deviation(x2, *args)[0]
+    while x3 - x0 > xtol:
+        if f1 <= f2:
+            x3, x2, f2 = x2, x1, f1
+            x1 = x3 - _INVPHI*(x3 - x0)
+            f1 = _deviation(x1, *args)[0]
+        else:
+            x0, x1, f1 = x1, x2, f2
+            x2 = x0 + _INVPHI*(x3 - x0)
+            f2 = _deviation(x2, *args)[0]
+
+    fa = (x0 + x3)/2
+    deviation, (v, a, g) = _deviation(fa, *args)
+    return {SIZING[method]: float(fa), 'v': float(v), 'a': float(a),
+            'g': float(g), 'deviation': float(deviation)}
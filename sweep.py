@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 16:02:33 2026
+
+Parameter sweeps: partitioning factors of surfaces and measures on a
+Cartesian grid spanning the ranges of validity in check_ranges.py, e.g. to
+plot the runoff fraction a of a roof for all combinations of P and ETP.
+"""
+
+import inspect
+import numpy as np
+from check_ranges import param_ranges, range_key, validRange, validJointRatio
+import regressions
+
+# climate inputs of the regressions and their keys in param_ranges
+CLIMATE = {'p': 'P', 'etp': 'ETp'}
+
+
+class SweepResult(object):
+    '''
+    N-dimensional results of a sweep. dims are the names of the swept
+    parameters, coords their values and result['a'] (as well as 'g', 'v'
+    and 'e') an array with one axis per dimension.
+    '''
+
+    def __init__(self, method, dims, coords, data):
+        self.method = method
+        self.dims = dims
+        self.coords = coords
+        self.data = data
+
+    def __getitem__(self, name):
+        return self.data[name]
+
+    def __repr__(self):
+        shape = ', '.join(f'{d}: {len(self.coords[d])}' for d in self.dims)
+        return f"SweepResult of {self.method} ({shape})"
+
+    def to_frame(self):
+        ''' long table with one row per combination of the parameters '''
+        import pandas as pd
+        index = pd.MultiIndex.from_product([self.coords[d] for d in self.dims],
+                                           names=self.dims)
+        return pd.DataFrame({k: v.ravel() for k, v in self.data.items()},
+                            index=index)
+
+
+def sweep(method, *dims, n=11, **params):
+    '''
+    Evaluates the regression of a surface element or measure on a Cartesian
+    grid of parameters with one broadcast numpy operation.
+
+    Parameters
+    ----------
+    method : string
+            name of the Surface or Measure method, e.g. "roof" or
+            "infilt_swale" (drainage is not available)
+
+    *dims : string
+           parameters swept over their range of validity in param_ranges,
+           e.g. "p", "etp", "sp"
+
+    n : int, optional
+       number of values per swept parameter. The default is 11.
+
+    **params : float or 1D array
+              fixed values of further parameters, arrays are swept as
+              additional dimensions. p and etp must be given if they are
+              not swept.
+
+    Notes
+    ------
+    The percentage of infiltration area of measures (fasf / fasm) defaults
+    to the standard value for the respective kf. Joint ratios of permeable
+    surfaces between 5 and 6 % have no equation and give NaN.
+
+    Returns
+    -------
+    results : SweepResult
+    '''
+    if method == 'drainage' or not hasattr(regressions, method):
+        raise Exception(f"No regression available for {method}")
+    kernel = getattr(regressions, method)
+    names = list(inspect.signature(kernel).parameters)
+
+    coords = {}
+    for d in dims:
+        key = CLIMATE.get(d) or range_key(d, method)
+        if d not in names or key is None:
+            raise Exception(f"{d} cannot be swept for {method}")
+        coords[d] = np.linspace(param_ranges[key][0], param_ranges[key][1], n)
+
+    values = {}
+    for k, val in params.items():
+        key = CLIMATE.get(k) or range_key(k, method)
+        if key is not None:
+            validRange(val, key)
+        if np.ndim(val) == 1:
+            coords[k] = np.asarray(val, dtype=float)
+        else:
+            values[k] = val
+    if method == 'permeable_surface' and 'fa' in values:
+        validJointRatio(values['fa'])
+    for k in CLIMATE:
+        if k not in coords and k not in values:
+            raise Exception(f"{k} must be swept or given")
+
+    # open grid: every dimension gets its own axis and is broadcast
+    dims = tuple(coords)
+    for i, d in enumerate(dims):
+        shape = [1]*len(dims)
+        shape[i] = len(coords[d])
+        values[d] = coords[d].reshape(shape)
+
+    # standard percentage of infiltration area of measures
+    for fa in ('fasf', 'fasm'):
+        if fa in names and fa not in values:
+            standard = getattr(regressions, f'{method}_{fa}')
+            values[fa] = standard(*[values[k] for k in
+                                    inspect.signature(standard).parameters])
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        fractions = kernel(**values)
+    shape = tuple(len(coords[d]) for d in dims)
+    data = {}
+    for name, x in zip(('a', 'g', 'v', 'e'), fractions):
+        data[name] = np.broadcast_to(x, shape).astype(float)
+
+    if method == 'permeable_surface':
+        gap = (values['fa'] > 5) & (values['fa'] < 6)
+        for name in data:
+            data[name][np.broadcast_to(gap, shape)] = np.nan
+
+    return SweepResult(method, dims, coords, data)
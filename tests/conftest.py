@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 23:41:07 2026
+
+Shared data of the tests: results of the original implementation and
+helpers. The modules of the repository are imported from its root
+directory.
+"""
+
+import os
+import sys
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dwa_a102 import StudyArea  # noqa: E402
+
+P, ETP = 700, 575
+
+# surfaces and their a, g, v, Au from the original implementation
+SURFACES = [
+    ('garden', dict(area=100), (0.2, 0.2, 0.6, 20)),
+    ('roof', dict(area=200, sp=0.4), (0.887, 0, 0.113, 177)),
+    ('flat_area', dict(area=300, sp=1.5), (0.783, 0, 0.217, 235)),
+    ('green_roof', dict(area=92, h=100), (0.467, 0, 0.533, 43)),
+    ('green_roof_shallow', dict(area=50), (0.602, 0, 0.398, 30)),
+    ('storage_roof', dict(area=70, sp=6), (0.629, 0, 0.371, 44)),
+    ('permeable_surface', dict(area=80, fa=3, kf=20),
+     (0.514, 0.304, 0.181, 41)),
+    ('permeable_surface', dict(area=80, fa=8, kf=40),
+     (0.196, 0.611, 0.193, 16)),
+    ('porous_surface', dict(area=90), (0.002, 0.568, 0.43, 0)),
+    ('paver_stonegrid', dict(area=60), (0.044, 0.72, 0.236, 3)),
+    ('gravel_cover', dict(area=40), (0.082, 0.487, 0.43, 3)),
+]
+
+# measures connected to the roof and the flat area above, their parameters
+# and a, g, v, e, Area of the measure from the original implementation
+MEASURES = [
+    ('surf_infiltration', dict(kf=500), (0.0, 0.853, 0.147, 0, 232)),
+    ('infilt_swale', dict(kf=42), (0.0, 0.95, 0.051, 0, 54)),
+    ('swale_trench', dict(kf=10), (0.003, 0.957, 0.04, 0, 40)),
+    ('swale_trench_system', dict(qdr=5, kf=1), (0.429, 0.529, 0.042, 0, 27)),
+    ('rainwater_usage', dict(vsp=50, vbr=1, fabw=2, qbw=60),
+     (0.5, 0, 0.177, 0.324, 0)),
+]
+
+
+def row(frame, i=-1):
+    ''' numbers of a row of a DataFrame as dict of floats '''
+    return {c: float(v) for c, v in frame.iloc[i].to_dict().items()
+            if c != 'Element'}
+
+
+@pytest.fixture
+def study_area():
+    return StudyArea(P, ETP)
+
+
+def cascade(model):
+    ''' roof -> cistern -> swale trench, and a garden '''
+    model.add('roof', 'roof', area=500, sp=0.3)
+    model.add('cistern', 'rainwater_usage', ['roof'], vsp=50, vbr=1,
+              fabw=2, qbw=60)
+    model.add('trench', 'swale_trench', ['cistern'], kf=10)
+    model.add('garden', 'garden', area=200)
+    return model
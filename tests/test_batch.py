@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 23:52:14 2026
+
+Surfaces and their batch mode compared to the original implementation.
+"""
+
+import numpy as np
+import pytest
+from dwa_a102 import StudyArea, watbal
+from check_ranges import validBatch
+from conftest import ETP, P, SURFACES, row
+
+
+@pytest.mark.parametrize('method, params, expected', SURFACES)
+def test_surface_matches_original(study_area, method, params, expected):
+    result = row(getattr(study_area, method)(**params))
+    a, g, v, au = expected
+    assert (result['a'], result['g'], result['v'], result['Au']) \
+        == pytest.approx((a, g, v, au))
+
+
+@pytest.mark.parametrize('method', sorted({s[0] for s in SURFACES}))
+def test_batch_equals_scalar(study_area, method):
+    cases = [params for name, params, _ in SURFACES if name == method]
+    arrays = {k: np.array([c[k] for c in cases] * 3, dtype=float)
+              for k in cases[0]}
+    batch = study_area.batch(method, **arrays)
+    for i in range(len(batch)):
+        scalar = getattr(study_area, method)(**{k: x[i] for k, x
+                                                in arrays.items()})
+        assert row(batch, i) == pytest.approx(row(scalar))
+
+
+def test_batch_connected_to_measure_equals_scalar(study_area):
+    batch = study_area.infilt_swale(42, study_area.batch('roof', [100, 200],
+                                                         sp=0.3))
+    scalar = study_area.infilt_swale(42, study_area.roof(100, 0.3),
+                                     study_area.roof(200, 0.3))
+    assert row(watbal(batch)) == pytest.approx(row(watbal(scalar)))
+    system = row(watbal(batch))
+    assert system['a'] + system['g'] + system['v'] == pytest.approx(1,
+                                                                    abs=5e-3)
+    # measures connected to a measure and to a batch of surfaces
+    cascade = study_area.swale_trench(
+        10, study_area.infilt_swale(42, study_area.roof(50, 0.3)),
+        study_area.batch('garden', [100, 200]))
+    nested = study_area.swale_trench(
+        10, study_area.infilt_swale(42, study_area.roof(50, 0.3)),
+        study_area.garden(100), study_area.garden(200))
+    assert row(watbal(cascade)) == pytest.approx(row(watbal(nested)))
+
+
+def test_batch_drop_keeps_positions(study_area):
+    area = np.array([100, 200, 300])
+    sp = np.array([0.3, 5, 0.4])
+    results = study_area.batch('roof', area, policy='drop', sp=sp)
+    assert list(results.index) == [0, 2]
+    compact = StudyArea(P, ETP, as_frame=False).batch('roof', area,
+                                                      policy='drop', sp=sp)
+    _, valid, _ = validBatch('roof', area=area, sp=sp)
+    assert len(compact) == valid.sum() == 2
+    with pytest.raises(Exception, match='1 of 3 rows'):
+        study_area.batch('roof', area, sp=sp)
@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 01:48:10 2026
+
+Batch runner for parcel inventories.
+"""
+
+import pandas as pd
+import pytest
+from batch_runner import main, run
+from dwa_a102 import StudyArea, watbal
+from conftest import ETP, P, row
+
+
+def test_batch_runner_counts_runoff_once(study_area, tmp_path):
+    inventory = tmp_path / 'parcels.csv'
+    inventory.write_text('id,element,area,sp,measure\n'
+                         'a,roof,200,0.4,M1\n'
+                         'b,garden,100,,\n'
+                         'c,flat_area,300,1.5,M1\n')
+    output = str(tmp_path / 'results.csv')
+    run(str(inventory), output, {'M1': {'method': 'infilt_swale', 'kf': 42}},
+        P, ETP, chunksize=2)
+    nested = watbal(study_area.infilt_swale(42, study_area.roof(200, 0.4),
+                                            study_area.flat_area(300, 1.5)),
+                    study_area.garden(100))
+    assert row(watbal(pd.read_csv(output))) == pytest.approx(row(nested))
+
+    with pytest.raises(Exception, match='not defined'):
+        run(str(inventory), output, {}, P, ETP)
+    assert not (tmp_path / 'results.csv').exists()
+
+
+def test_batch_runner_chunks_and_policies(tmp_path):
+    inventory = tmp_path / 'parcels.csv'
+    inventory.write_text('id,element,area,sp\n'
+                         'a,roof,200,0.4\n'
+                         'b,roof,100,\n'
+                         'c,roof,300,5\n'
+                         'd,garden,100,\n')
+    output = tmp_path / 'results.csv'
+    with pytest.raises(Exception, match='not valid'):
+        run(str(inventory), str(output), p=P, etp=ETP)
+
+    main([str(inventory), str(output), '--p', str(P), '--etp', str(ETP),
+          '--chunksize', '1', '--policy', 'drop'])
+    results = pd.read_csv(output)
+    assert results['id'].tolist() == ['a', 'b', 'd']
+    # empty values take the defaults of the method
+    default = StudyArea(P, ETP).roof(100)
+    assert results['Va'][1] == default['Va'][0]
+    whole = run(str(inventory), str(tmp_path / 'whole.csv'), p=P, etp=ETP,
+                policy='drop')
+    assert whole == 3
+    pd.testing.assert_frame_equal(pd.read_csv(tmp_path / 'whole.csv'),
+                                  results, check_dtype=False)
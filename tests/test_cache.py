@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 02:34:18 2026
+
+Cache of the results of surfaces and measures.
+"""
+
+import pickle
+import numpy as np
+from cache import ResultCache
+from network import Network, evaluate_parallel
+from results import ElementResult
+from conftest import ETP, P, cascade
+
+
+def test_cached_network_equals_uncached(study_area):
+    cache = ResultCache()
+    uncached = cascade(Network(study_area)).evaluate()
+    for _ in range(2):
+        assert cascade(Network(study_area, cache=cache)).evaluate() \
+            == uncached
+    assert cache.stats()['hits'] == len(uncached)
+
+
+def test_key():
+    # numpy scalars give the same key as Python numbers
+    assert ResultCache.key(P, ETP, 'roof', {'area': np.int64(500)}) \
+        == ResultCache.key(P, ETP, 'roof', {'area': 500.0})
+    # defaults of the method given explicitly or not
+    assert ResultCache.key(P, ETP, 'roof', {'area': 500}) \
+        == ResultCache.key(P, ETP, 'roof', {'area': 500, 'sp': 0.3})
+    assert ResultCache.key(P, ETP, 'infilt_swale',
+                           {'kf': 42, 'Au': 500, 'Va': 300}) \
+        == ResultCache.key(P, ETP, 'infilt_swale',
+                           {'kf': 42, 'fasm': 'fasm_standard',
+                            'Au': 500, 'Va': 300})
+    assert ResultCache.key(P, ETP, 'roof', {'area': 500}) \
+        != ResultCache.key(P, ETP, 'roof', {'area': 500, 'sp': 0.4})
+    assert ResultCache.key(P, ETP, 'infilt_swale',
+                           {'kf': 42, 'Au': 500, 'Va': 300}) \
+        != ResultCache.key(P, ETP, 'infilt_swale',
+                           {'kf': 42, 'Au': 500, 'Va': 301})
+
+
+def test_put_and_eviction():
+    cache = ResultCache(max_entries=3)
+    result = ElementResult('Roof', 500, 450, 700, 575, 0.9, 0, 0.1, 0,
+                           350, 315, 0, 35, 0)
+    keys = [ResultCache.key(P, ETP, 'roof', {'area': area})
+            for area in range(1, 5)]
+    cache.put(keys[0], result)
+    cache.put(keys[0], result)
+    assert len(cache) == 1
+    cache.put(keys[1], result)
+    cache.put(keys[2], result)
+    # the first result was used last, the second is removed
+    assert cache.get(keys[0]) == result
+    cache.put(keys[3], result)
+    assert len(cache) == 3
+    assert cache.get(keys[1]) is None
+    assert all(cache.get(k) == result for k in (keys[0], keys[2], keys[3]))
+    assert cache.stats()['hits'] == 4 and cache.stats()['misses'] == 1
+
+
+def test_pickled_cache_in_parallel(study_area, tmp_path):
+    with ResultCache(str(tmp_path / 'results.sqlite')) as cache:
+        networks = [cascade(Network(study_area, cache=cache))
+                    for _ in range(4)]
+        cache.commit()
+        copy = pickle.loads(pickle.dumps(cache))
+        assert len(copy) == 0 and copy.stats()['hits'] == 0
+        volumes, system = evaluate_parallel(networks, max_workers=2)
+        reference = cascade(Network(study_area)).watbal()
+        assert np.allclose(volumes, volumes[0])
+        assert system['Vp'] == reference['Vp'].iloc[-1]*4
+        # results stored by the workers are seen by this process
+        assert len(ResultCache(cache.path)) == len(reference) - 1
@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 01:39:26 2026
+
+Checks of parameters against their ranges of validity.
+"""
+
+import numpy as np
+import pytest
+from check_ranges import validBatch, validMask
+
+
+def test_valid_batch_flag_and_report():
+    params, valid, report = validBatch('roof', sp=np.array([0.3, 0.05, 0.7]),
+                                       p=800, etp=500)
+    np.testing.assert_array_equal(params['sp'], [0.3, 0.05, 0.7])
+    np.testing.assert_array_equal(valid, [True, False, False])
+    assert report == {1: 'sp = 0.05 not in 0.1 - 0.6',
+                      2: 'sp = 0.7 not in 0.1 - 0.6'}
+
+
+def test_valid_batch_policies():
+    sp = np.array([0.3, 0.05, 0.7])
+    with pytest.raises(Exception, match=r'2 of 3 rows .*1: sp = 0.05'):
+        validBatch('roof', 'raise', sp=sp)
+    params, valid, _ = validBatch('roof', 'drop', sp=sp, area=100)
+    np.testing.assert_array_equal(params['sp'], [0.3])
+    assert params['area'] == 100
+    params, valid, _ = validBatch('roof', 'clip', sp=sp)
+    np.testing.assert_array_equal(params['sp'], [0.3, 0.1, 0.6])
+    assert not valid[1:].any()
+    with pytest.raises(Exception, match='Unknown policy'):
+        validBatch('roof', 'ignore', sp=sp)
+
+
+def test_joint_ratio_gap_of_permeable_surfaces():
+    fa = np.array([2, 5, 5.2, 5.8, 6, 10, 11])
+    params, valid, report = validBatch('permeable_surface', 'clip', fa=fa)
+    np.testing.assert_array_equal(valid, [1, 1, 0, 0, 1, 1, 0])
+    np.testing.assert_array_equal(params['fa'], [2, 5, 5, 6, 6, 10, 10])
+    assert report[2] == 'fa = 5.2 not in 2 - 5 or 6 - 10'
+    # the gap applies only to permeable surfaces
+    assert validBatch('paver_stonegrid', fa=25)[1].all()
+
+
+def test_valid_mask():
+    mask = validMask('permeable_surface', p=np.array([[800], [400]]),
+                     etp=500, fa=np.array([3, 5.5, np.nan]))
+    np.testing.assert_array_equal(mask, [[True, False, False],
+                                         [False, False, False]])
+    assert validMask(None, p=800, etp=500)
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 00:58:19 2026
+
+Climate data looked up by coordinates.
+"""
+
+import numpy as np
+import pytest
+from climate import climate_at, climate_coords, climate_dict, nearest_city
+from dwa_a102 import StudyArea
+
+
+def test_nearest_city():
+    assert nearest_city(*climate_coords['Berlin']) == ('Berlin', 0.0)
+    names, distance = nearest_city(np.array([52.5, 52.39]),
+                                   np.array([13.4, 13.07]))
+    assert names.tolist() == ['Berlin', 'Potsdam']
+    assert (distance < 5).all()
+    # 0.1 degrees of latitude are 11.1 km
+    assert nearest_city(52.620, 13.405) == ('Berlin', pytest.approx(11.12,
+                                                                   abs=0.01))
+
+
+def test_climate_at_nearest_city():
+    for name in ('Berlin', 'Stuttgart', 'Rostock'):
+        assert climate_at(*climate_coords[name]) \
+            == tuple(climate_dict[name])
+    p, etp = climate_at(np.array([52.52, 48.776]), 13.405)
+    assert p[0] == climate_dict['Berlin'][0]
+    assert StudyArea(coords=climate_coords['Berlin']).p \
+        == climate_dict['Berlin'][0]
+
+
+def test_climate_at_inverse_distance_weights():
+    berlin, potsdam = climate_coords['Berlin'], climate_coords['Potsdam']
+    # at a city, its values dominate
+    assert climate_at(*berlin, k=4) == pytest.approx(climate_dict['Berlin'])
+    # halfway between two cities (and far from others), about the mean
+    middle = ((berlin[0] + potsdam[0])/2, (berlin[1] + potsdam[1])/2)
+    p, etp = climate_at(*middle, k=2)
+    assert p == pytest.approx((climate_dict['Berlin'][0]
+                               + climate_dict['Potsdam'][0])/2, abs=0.5)
+    # weighted values lie within the range of the cities used
+    p, _ = climate_at(50.5, 10.0, k=5)
+    values = [climate_dict[name][0] for name in climate_coords]
+    assert min(values) <= p <= max(values)
+
+
+def test_climate_at_rejects_far_coordinates_and_invalid_k():
+    with pytest.raises(Exception, match='from the nearest city'):
+        climate_at(0, 0)
+    with pytest.raises(Exception, match='from the nearest city'):
+        climate_at(np.array([52.5, 0]), np.array([13.4, 0]))
+    assert climate_at(0, 0, max_distance=None)[0] > 0
+    for k in (0, len(climate_coords) + 1):
+        with pytest.raises(Exception, match='k must be between'):
+            climate_at(52.5, 13.4, k=k)
+    with pytest.raises(Exception, match='from the nearest city'):
+        StudyArea(coords=(0, 0))
@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 00:47:30 2026
+
+Grid mode: reading ASCII grids and the balance of gridded P and ETP.
+"""
+
+import gzip
+import numpy as np
+import pytest
+from dwa_a102 import StudyArea
+from grids import grid_balance, read_ascii_grid
+
+GRID = '''NCOLS 3
+NROWS 2
+XLLCORNER 3280000
+YLLCORNER 5230000
+CELLSIZE 1000
+NODATA_VALUE -999
+7000 8000 -999
+9000 6000 12000
+'''
+
+
+@pytest.mark.parametrize('name, opener', [('p.asc', open),
+                                          ('p.asc.gz', gzip.open)])
+def test_read_ascii_grid(tmp_path, name, opener):
+    path = str(tmp_path / name)
+    with opener(path, 'wt') as f:
+        f.write(GRID)
+    values, header = read_ascii_grid(path, scale=0.1)
+    assert header == {'ncols': 3, 'nrows': 2, 'xllcorner': 3280000,
+                      'yllcorner': 5230000, 'cellsize': 1000,
+                      'nodata_value': -999}
+    np.testing.assert_allclose(values, [[700, 800, np.nan],
+                                        [900, 600, 1200]])
+
+
+def test_grid_balance_equals_scalar():
+    p = np.array([[600, 800], [1000, 1200]])
+    etp = np.array([[500, 550], [600, 650]])
+    results = grid_balance('permeable_surface', p, etp, fa=3, kf=20)
+    assert results['valid'].all()
+    for i, j in np.ndindex(p.shape):
+        scalar = StudyArea(p[i, j], etp[i, j], as_frame=False) \
+            .permeable_surface(1000, 3, 20)
+        for name in ('a', 'g', 'v', 'e'):
+            assert results[name][i, j] == pytest.approx(getattr(scalar, name),
+                                                        abs=5e-4)
+
+
+def test_grid_balance_marks_invalid_cells():
+    p = np.array([[800, np.nan], [400, 800]])
+    etp = np.full((2, 2), 500)
+    # joint ratio in the gap between the equations in one cell only
+    fa = np.array([[3, 3], [3, 5.5]])
+    results = grid_balance('permeable_surface', p, etp, fa=fa, kf=20)
+    np.testing.assert_array_equal(results['valid'],
+                                  [[True, False], [False, False]])
+    assert np.isfinite(results['a'][0, 0])
+    assert np.isnan(results['a'][~results['valid']]).all()
@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 00:21:45 2026
+
+Measures with connected surfaces compared to the original implementation.
+"""
+
+import pytest
+from dwa_a102 import watbal
+from conftest import MEASURES, row
+
+
+@pytest.mark.parametrize('method, params, expected', MEASURES)
+def test_measure_matches_original(study_area, method, params, expected):
+    roof = study_area.roof(200, 0.4)
+    flat = study_area.flat_area(300, 1.5)
+    results = getattr(study_area, method)(*params.values(), roof, flat)
+    result = row(results)
+    a, g, v, e, area = expected
+    assert (result['a'], result['g'], result['v'], result['e'],
+            result['Area']) == pytest.approx((a, g, v, e, area))
+    # runoff of the connected surfaces is passed to the measure
+    assert results['Va'].iloc[:-1].sum() == 0
+
+
+def test_measure_gathers_many_surfaces(study_area):
+    roofs = [study_area.roof(10 + i, 0.3) for i in range(50)]
+    results = study_area.infilt_swale(42, *roofs)
+    assert len(results) == 51
+    assert results['Au'].iloc[-1] == sum(r['Au'].iloc[0] for r in roofs)
+    assert results['Vp'].iloc[:-1].tolist() == [r['Vp'].iloc[0]
+                                                for r in roofs]
+    system = row(watbal(results))
+    assert system['Vp'] == sum(results['Vp'])
+    assert system['a'] + system['g'] + system['v'] == pytest.approx(1,
+                                                                    abs=5e-3)
@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 01:15:38 2026
+
+Monte Carlo uncertainty propagation.
+"""
+
+import numpy as np
+import pytest
+from dwa_a102 import StudyArea, watbal
+from montecarlo import monte_carlo
+
+ELEMENTS = [{'method': 'roof', 'area': 500, 'sp': ('uniform', 0.2, 0.6),
+             'connected': True},
+            {'method': 'garden', 'area': 200, 'connected': False}]
+MEASURE = {'method': 'infilt_swale', 'kf': ('uniform', 20, 100)}
+
+
+def test_monte_carlo_independent_of_workers():
+    kwargs = dict(p=('normal', 700, 50), etp=575, n=3000, chunk_size=1000,
+                  seed=42, return_samples=True)
+    serial = monte_carlo(ELEMENTS, MEASURE, max_workers=1, **kwargs)
+    parallel = monte_carlo(ELEMENTS, MEASURE, max_workers=2, **kwargs)
+    for name in ('a', 'g', 'v', 'e'):
+        np.testing.assert_array_equal(serial['samples'][name],
+                                      parallel['samples'][name])
+        np.testing.assert_array_equal(serial[name], parallel[name])
+    assert serial['n_valid'] + serial['n_invalid'] == 3000
+    other = monte_carlo(ELEMENTS, MEASURE, max_workers=1,
+                        **dict(kwargs, seed=43))
+    assert not np.array_equal(other['samples']['g'], serial['samples']['g'])
+
+
+def test_monte_carlo_fixed_values_equal_watbal():
+    results = monte_carlo([dict(ELEMENTS[0], sp=0.4), ELEMENTS[1]],
+                          {'method': 'infilt_swale', 'kf': 42}, p=700,
+                          etp=575, n=10, max_workers=1)
+    study_area = StudyArea(700, 575)
+    system = watbal(study_area.infilt_swale(42, study_area.roof(500, 0.4)),
+                    study_area.garden(200)).iloc[-1]
+    for name in ('a', 'g', 'v'):
+        assert results[name][2] == pytest.approx(system[name], abs=2e-3)
+
+
+def test_monte_carlo_discards_invalid_samples():
+    elements = [{'method': 'permeable_surface', 'area': 100,
+                 'fa': ('uniform', 2, 10), 'kf': 20, 'connected': False}]
+    results = monte_carlo(elements, p=700, etp=575, n=8000, seed=1,
+                          max_workers=1)
+    # joint ratios between 5 and 6 % have no equation: about 1/8
+    assert results['n_invalid'] / 8000 == pytest.approx(1/8, abs=0.02)
+    results = monte_carlo(ELEMENTS, p=('uniform', 200, 400), etp=575, n=100,
+                          max_workers=1)
+    assert results['n_valid'] == 0
+    assert np.isnan(results['a']).all()
+
+
+@pytest.mark.parametrize('n, chunk_size', [(0, 100), (100, 0)])
+def test_monte_carlo_rejects_empty_runs(n, chunk_size):
+    with pytest.raises(Exception, match='at least 1'):
+        monte_carlo(ELEMENTS, n=n, chunk_size=chunk_size, max_workers=1)
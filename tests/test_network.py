@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 01:58:33 2026
+
+Networks of surfaces and measures compared to nested calls of the methods.
+"""
+
+import pytest
+from dwa_a102 import watbal
+from network import Network, SystemModel
+from conftest import MEASURES, cascade, row
+
+
+@pytest.mark.parametrize('method, params, expected', MEASURES)
+def test_network_equals_frame(study_area, method, params, expected):
+    frame = getattr(study_area, method)(*params.values(),
+                                        study_area.roof(200, 0.4),
+                                        study_area.flat_area(300, 1.5))
+    net = Network(study_area)
+    net.add('roof', 'roof', area=200, sp=0.4)
+    net.add('flat', 'flat_area', area=300, sp=1.5)
+    net.add('measure', method, ['roof', 'flat'], **params)
+    assert row(net.watbal()) == pytest.approx(row(watbal(frame)))
+
+
+def test_network_cascade_equals_nested_calls(study_area):
+    nested = watbal(
+        study_area.swale_trench(10, study_area.rainwater_usage(
+            50, 1, 2, 60, study_area.roof(500, 0.3))),
+        study_area.garden(200))
+    net = cascade(Network(study_area))
+    assert row(net.watbal()) == pytest.approx(row(nested))
+
+
+def test_network_rejects_invalid_graphs(study_area):
+    net = Network(study_area)
+    net.add('roof', 'roof', area=100)
+    net.add('swale', 'infilt_swale', ['roof'], kf=42)
+    with pytest.raises(Exception, match='already exists'):
+        net.add('roof', 'roof', area=100)
+    with pytest.raises(Exception, match='Unknown input'):
+        net.add('trench', 'swale_trench', ['street'], kf=10)
+    with pytest.raises(Exception, match='already drains to swale'):
+        net.add('trench', 'swale_trench', ['roof'], kf=10)
+    with pytest.raises(Exception, match='cannot have inputs'):
+        net.add('garden', 'garden', ['swale'], area=100)
+    assert net.order() == ['roof', 'swale']
+
+
+def test_system_model_update_equals_fresh_evaluation(study_area):
+    model = cascade(SystemModel(study_area))
+    model.system()
+    for name, params in [('roof', dict(sp=0.5)), ('trench', dict(kf=20)),
+                         ('cistern', dict(vsp=100)), ('garden',
+                                                      dict(area=400))]:
+        model.update(name, **params)
+        fresh = SystemModel(study_area)
+        for node, (method, node_params) in model.nodes.items():
+            fresh.add(node, method, model.inputs[node], **node_params)
+        assert model.totals == pytest.approx(fresh.volumes())
+        assert model.system() == fresh.system()
+
+
+def test_system_model_recomputes_only_downstream(study_area):
+    model = cascade(SystemModel(study_area))
+    model.system()
+    assert model.evaluations == 4
+    model.update('garden', area=300)
+    assert model.evaluations == 5
+    model.update('roof', sp=0.5)
+    assert model.evaluations == 8
+    # unchanged inflow stops the update
+    model.update('roof', sp=0.5)
+    assert model.evaluations == 9
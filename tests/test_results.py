@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 00:34:12 2026
+
+Compact results (as_frame=False) compared to the DataFrames of the scalar
+methods.
+"""
+
+import pandas as pd
+import pytest
+from dwa_a102 import StudyArea, watbal
+from results import COLUMNS, ElementResult, ResultTable
+from conftest import ETP, MEASURES, P, SURFACES, row
+
+
+@pytest.mark.parametrize('method, params, expected', SURFACES)
+def test_compact_surface_equals_frame(method, params, expected):
+    frame = row(getattr(StudyArea(P, ETP), method)(**params))
+    compact = getattr(StudyArea(P, ETP, as_frame=False), method)(**params)
+    assert row(compact.to_frame()) == frame
+
+
+@pytest.mark.parametrize('method, params, expected', MEASURES)
+def test_compact_measure_equals_frame(study_area, method, params, expected):
+    frame = getattr(study_area, method)(*params.values(),
+                                        study_area.roof(200, 0.4),
+                                        study_area.flat_area(300, 1.5))
+    compact_area = StudyArea(P, ETP, as_frame=False)
+    compact = getattr(compact_area, method)(
+        *params.values(), compact_area.roof(200, 0.4),
+        compact_area.flat_area(300, 1.5))
+    assert isinstance(compact, ResultTable)
+    pd.testing.assert_frame_equal(compact.to_frame()[COLUMNS],
+                                  frame[COLUMNS], check_dtype=False)
+    assert row(watbal(compact)) == pytest.approx(row(watbal(frame)))
+
+
+def test_element_result_is_a_record():
+    result = StudyArea(P, ETP, as_frame=False).roof(200, 0.4)
+    assert isinstance(result, ElementResult)
+    assert result._fields == tuple(COLUMNS)
+    table = ResultTable()
+    table.append(result)
+    table.append(result._asdict())
+    assert len(table) == 2
+    assert table.last('Va') == result.Va
@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 02:10:47 2026
+
+Scenario files and their content hashes.
+"""
+
+import json
+import pytest
+from dwa_a102 import StudyArea
+from network import Network
+from scenario import load_scenario, read_scenario, scenario_hash
+from conftest import row
+
+SCENARIO = {'climate': {'p': 700, 'etp': 575},
+            'nodes': [{'name': 'roof', 'method': 'roof', 'area': 500,
+                       'sp': 0.3},
+                      {'name': 'garden', 'method': 'garden', 'area': 200},
+                      {'name': 'swale', 'method': 'infilt_swale',
+                       'inputs': ['roof'], 'kf': 42}]}
+
+TOML = '''
+[climate]
+etp = 575.0
+p = 700
+
+[[nodes]]
+name = "swale"
+method = "infilt_swale"
+kf = 42.0
+inputs = ["roof"]
+
+[[nodes]]
+name = "garden"
+method = "garden"
+area = 200
+
+[[nodes]]
+name = "roof"
+method = "roof"
+sp = 0.3
+area = 500
+'''
+
+
+def test_hash_independent_of_format_and_order(tmp_path):
+    (tmp_path / 'a.json').write_text(json.dumps(SCENARIO, indent=2))
+    (tmp_path / 'b.toml').write_text(TOML)
+    hashes = {scenario_hash(read_scenario(str(tmp_path / name)))
+              for name in ('a.json', 'b.toml')}
+    assert hashes == {scenario_hash(SCENARIO)}
+    # defaults of the climate and the methods given explicitly
+    explicit = json.loads(json.dumps(SCENARIO))
+    explicit['climate']['p_corr_factor'] = 1
+    explicit['nodes'][2]['fasm'] = 'fasm_standard'
+    assert scenario_hash(explicit) == scenario_hash(SCENARIO)
+
+
+def test_hash_changes_with_content():
+    changed = json.loads(json.dumps(SCENARIO))
+    changed['nodes'][0]['sp'] = 0.4
+    assert scenario_hash(changed) != scenario_hash(SCENARIO)
+    changed = json.loads(json.dumps(SCENARIO))
+    changed['nodes'][2]['inputs'] = []
+    assert scenario_hash(changed) != scenario_hash(SCENARIO)
+
+
+def test_load_scenario_equals_network():
+    model = load_scenario(SCENARIO)
+    net = Network(StudyArea(700, 575))
+    net.add('roof', 'roof', area=500, sp=0.3)
+    net.add('garden', 'garden', area=200)
+    net.add('swale', 'infilt_swale', ['roof'], kf=42)
+    assert row(model.watbal()) == pytest.approx(row(net.watbal()))
+    assert model.system()['Vp'] == row(net.watbal())['Vp']
+
+
+def test_invalid_scenarios():
+    with pytest.raises(Exception, match='Unknown keys'):
+        scenario_hash(dict(SCENARIO, units='mm'))
+    with pytest.raises(Exception, match='Unknown method'):
+        scenario_hash({'nodes': [{'name': 'x', 'method': 'lake'}]})
+    with pytest.raises(Exception, match='not unique'):
+        load_scenario({'nodes': SCENARIO['nodes'] + SCENARIO['nodes'][:1]})
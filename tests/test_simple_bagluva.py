@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 00:08:36 2026
+
+Bagrov's equation and direct runoff ratios of simple_bagluva.py.
+"""
+
+import numpy as np
+import pytest
+from simple_bagluva import bagrov_adaptive, direct_runoff_ratio, \
+    etr_ratio_table
+
+# analytic solutions of Bagrov's equation: y = f(x) for n = 1 and n = 2
+EXACT = [(1, lambda x: -np.expm1(-x)), (2, np.tanh)]
+
+# direct runoff ratios of the original implementation on both sides of the
+# class boundaries: land use, distance to groundwater -> one row per soil
+# (SOILS) and one column per slope (SLOPES)
+SOILS = [1, 2, 2.5, 4, 4.5, 5]
+SLOPES = [0, 1.9, 2, 3.9, 4, 9.9, 10, 20]
+DIRECT_RUNOFF = {
+    ('open', 0.5): [[0.5, 0.5, 0.5, 0.5, 0.8, 0.8, 0.8, 0.8],
+                    [0.5, 0.5, 0.5, 0.5, 0.8, 0.8, 0.8, 0.8],
+                    [0.5, 0.5, 0.6, 0.6, 0.8, 0.8, 1.0, 1.0],
+                    [0.5, 0.5, 0.6, 0.6, 0.8, 0.8, 1.0, 1.0],
+                    [0.7, 0.7, 0.75, 0.75, 0.85, 0.85, 1.0, 1.0],
+                    [0.7, 0.7, 0.75, 0.75, 0.85, 0.85, 1.0, 1.0]],
+    ('open', 1): [[0.0, 0.0, 0.15, 0.15, 0.4, 0.4, 0.65, 0.65],
+                  [0.0, 0.0, 0.15, 0.15, 0.4, 0.4, 0.65, 0.65],
+                  [0.2, 0.2, 0.55, 0.55, 0.7, 0.7, 1.0, 1.0],
+                  [0.2, 0.2, 0.55, 0.55, 0.7, 0.7, 1.0, 1.0],
+                  [0.65, 0.65, 0.7, 0.7, 0.8, 0.8, 1.0, 1.0],
+                  [0.65, 0.65, 0.7, 0.7, 0.8, 0.8, 1.0, 1.0]],
+    ('forest', 0.5): [[0.2, 0.2, 0.2, 0.2, 0.5, 0.5, 0.5, 0.5],
+                      [0.2, 0.2, 0.2, 0.2, 0.5, 0.5, 0.5, 0.5],
+                      [0.3, 0.3, 0.45, 0.45, 0.55, 0.55, 0.95, 0.95],
+                      [0.3, 0.3, 0.45, 0.45, 0.55, 0.55, 0.95, 0.95],
+                      [0.5, 0.5, 0.55, 0.55, 0.65, 0.65, 0.95, 0.95],
+                      [0.5, 0.5, 0.55, 0.55, 0.65, 0.65, 0.95, 0.95]],
+    ('forest', 1): [[0.0, 0.0, 0.05, 0.05, 0.35, 0.35, 0.45, 0.45],
+                    [0.0, 0.0, 0.05, 0.05, 0.35, 0.35, 0.45, 0.45],
+                    [0.05, 0.05, 0.42, 0.42, 0.57, 0.57, 0.9, 0.9],
+                    [0.05, 0.05, 0.42, 0.42, 0.57, 0.57, 0.9, 0.9],
+                    [0.4, 0.4, 0.45, 0.45, 0.6, 0.6, 0.9, 0.9],
+                    [0.4, 0.4, 0.45, 0.45, 0.6, 0.6, 0.9, 0.9]],
+}
+
+
+@pytest.mark.parametrize('land, gwd', DIRECT_RUNOFF)
+def test_direct_runoff_ratio_matches_original(land, gwd):
+    expected = DIRECT_RUNOFF[land, gwd]
+    for soil, values in zip(SOILS, expected):
+        for slope, value in zip(SLOPES, values):
+            assert direct_runoff_ratio(soil, slope, gwd, land) == value
+    # the same values for arrays at once
+    result = direct_runoff_ratio(np.array(SOILS)[:, None], SLOPES, gwd, land)
+    np.testing.assert_array_equal(result, expected)
+
+
+def test_direct_runoff_ratio_rejects_invalid_input():
+    with pytest.raises(ValueError, match='land use'):
+        direct_runoff_ratio(3, 5, 2, 'meadow')
+    with pytest.raises(ValueError, match=r'positions \[1\]'):
+        direct_runoff_ratio([3, np.nan], 5, 2, 'open')
+
+
+@pytest.mark.parametrize('n, exact', EXACT)
+def test_bagrov_adaptive_matches_analytic_solution(n, exact):
+    y = np.linspace(0, 0.99, 50)
+    x = bagrov_adaptive(n, y)
+    assert np.abs(exact(x) - y).max() < 1e-10
+    assert bagrov_adaptive(n, []).shape == (0,)
+
+
+@pytest.mark.parametrize('n, exact', EXACT)
+def test_etr_ratio_table_error_bound(n, exact):
+    pe = np.linspace(0, 4, 1001)
+    assert np.abs(etr_ratio_table(pe, n) - exact(pe)).max() < 3.5e-5
+
+
+def test_etr_ratio_table_missing_values():
+    pe = np.array([0.5, np.nan, 1.0, np.inf, 2.0])
+    n = np.array([2.0, 2.0, np.nan, 2.0, 2.0])
+    result = etr_ratio_table(pe, n)
+    assert np.array_equal(np.isnan(result), [False, True, True, True, False])
+    assert result[[0, 4]] == pytest.approx(np.tanh(pe[[0, 4]]), abs=3.5e-5)
+    assert np.isnan(etr_ratio_table(np.nan, 2))
+    with pytest.raises(ValueError, match='n must be within'):
+        etr_ratio_table([1.0, 1.0], [np.nan, 20])
@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 01:27:04 2026
+
+Sizing of measures compared to watbal().
+"""
+
+import pytest
+from dwa_a102 import StudyArea, watbal
+from sizing import SIZING, size_measure
+import regressions
+
+
+@pytest.mark.parametrize('method, kf', [('infilt_swale', 42),
+                                        ('swale_trench', 10),
+                                        ('surf_infiltration', 500)])
+def test_size_measure_equals_watbal(method, kf):
+    study_area = StudyArea(700, 575)
+    roof = study_area.roof(500, 0.3)
+    garden = study_area.garden(300)
+    target = study_area.natural_wb_guess(2, 3, 3, 2, 'open')
+    result = size_measure(study_area, method, kf, roof, target=target,
+                          unconnected=(garden,))
+    fa = SIZING[method]
+
+    # the shares of the sized system are those of watbal()
+    def system(size):
+        measure = getattr(study_area, method)(kf, roof, **{fa: size})
+        return watbal(measure, garden).iloc[-1]
+    sized = system(result[fa])
+    for c in 'vag':
+        assert result[c] == pytest.approx(sized[c], abs=2e-3)
+    # the size of a system is found again from its water balance
+    low, high = getattr(regressions, f'{method}_{fa}_range')(kf)
+    assert low <= result[fa] <= high
+    size = low + 0.3*(high - low)
+    known = system(size)
+    found = size_measure(study_area, method, kf, roof, target=(
+        known['v'], known['a'], known['g']), unconnected=(garden,))
+    assert found['deviation'] < 1e-5
+    assert system(found[fa])[['v', 'a', 'g']].tolist() \
+        == pytest.approx(known[['v', 'a', 'g']].tolist(), abs=2e-3)
+
+
+def test_size_measure_rejects_other_measures():
+    study_area = StudyArea(700, 575)
+    with pytest.raises(Exception, match='cannot be sized'):
+        size_measure(study_area, 'drainage', 42, study_area.roof(500, 0.3),
+                     target=(1, 1, 1))
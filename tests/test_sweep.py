@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 01:06:52 2026
+
+Parameter sweeps compared to the scalar methods.
+"""
+
+import numpy as np
+import pytest
+from dwa_a102 import StudyArea
+from sweep import sweep
+
+
+def test_sweep_surface_equals_scalar():
+    result = sweep('roof', 'p', 'etp', n=4, sp=0.4)
+    assert result.dims == ('p', 'etp')
+    assert result['a'].shape == (4, 4)
+    for i, p in enumerate(result.coords['p']):
+        for j, etp in enumerate(result.coords['etp']):
+            scalar = StudyArea(p, etp, as_frame=False).roof(1000, 0.4)
+            for name in ('a', 'g', 'v', 'e'):
+                assert result[name][i, j] == pytest.approx(
+                    getattr(scalar, name), abs=5e-4)
+
+
+def test_sweep_measure_equals_scalar():
+    result = sweep('infilt_swale', 'kf', n=5, p=700, etp=575)
+    for i, kf in enumerate(result.coords['kf']):
+        study_area = StudyArea(700, 575, as_frame=False)
+        scalar = study_area.infilt_swale(kf, study_area.roof(1000, 0.4))
+        for name in ('a', 'g', 'v', 'e'):
+            assert result[name][i] == pytest.approx(scalar.last(name),
+                                                    abs=5e-4)
+
+
+def test_sweep_arrays_gap_and_errors():
+    result = sweep('permeable_surface', 'fa', n=17, p=700, etp=575,
+                   kf=np.array([20, 40]))
+    assert result['a'].shape == (17, 2)
+    gap = (result.coords['fa'] > 5) & (result.coords['fa'] < 6)
+    assert gap.any()
+    assert np.isnan(result['a'][gap]).all()
+    assert np.isfinite(result['a'][~gap]).all()
+    assert len(result.to_frame()) == 34
+    with pytest.raises(Exception, match='cannot be swept'):
+        sweep('roof', 'kf', p=700, etp=575)
+    with pytest.raises(Exception, match='must be swept or given'):
+        sweep('roof', 'sp', p=700)
@@ -54,27 +54,51 @@ def update_data(index, option, cont):
     st.session_state.data_list[index] = edited_data
 
 
+# maximum number of element results kept in the cache
+CACHE_ENTRIES = 256
+
+
+@st.cache_resource
+def register_elements():
+    '''
+    registers surfaces and measures once per server process instead of
+    inspecting the signatures on every rerun of the script
+    '''
+    dict_elements = {}
+    dict_elements['Gärten, Grünflächen (Garden / Green Area)'] = register_measure(StudyArea.garden)
+    dict_elements['Versiegelte Fläche (Flat Area)'] = register_measure(StudyArea.flat_area)
+    dict_elements['wassergebundene Decke (Gravel Cover)'] = register_measure(StudyArea.gravel_cover)
+    dict_elements['Teildurchlässige Flächenbeläge (Permeable Surface)'] = register_measure(StudyArea.permeable_surface)
+    dict_elements['Poren-/Sicherstreine, Schotter (Porous Surface)'] = register_measure(StudyArea.porous_surface)
+    dict_elements['Rasengittersteine (Paver Stonegrid)'] = register_measure(StudyArea.paver_stonegrid)
+    dict_elements['Steildach (Roof)']=register_measure(StudyArea.roof)
+    dict_elements['Grünes Dach (Green Roof)']=register_measure(StudyArea.green_roof)
+    dict_elements['Grünes Dach minimal (Green Roof Shallow)'] = register_measure(StudyArea.green_roof_shallow)
+    dict_elements['Einstaudach (Storage Roof)'] = register_measure(StudyArea.storage_roof)
+
+    dict_measures = {}
+    dict_measures['Mulde (Infiltration Swale)'] = register_measure(StudyArea.infilt_swale)
+    #dict_measures['Drainage (Entwässerung)'] = register_measure(StudyArea.drainage) # fix connection types
+    dict_measures['Flächenversickerung (Surf infiltration)'] = register_measure(StudyArea.surf_infiltration)
+    dict_measures['Mulde mit Rigole (Swale Trench)'] = register_measure(StudyArea.swale_trench)
+    dict_measures['Mulden-Rigolen-System (Swale-Trench System)'] = register_measure(StudyArea.swale_trench_system)
+    dict_measures['Regenwassernutzung (Rainwater Usage)'] = register_measure(StudyArea.rainwater_usage)
+    dict_measures['Teich (Pond System)'] = register_measure(StudyArea.pond_system)
+    return dict_elements, dict_measures
+
+
+@st.cache_data(max_entries=CACHE_ENTRIES)
+def element_result(p, etp, function, params):
+    '''
+    results of a surface element, cached by climate, element type and
+    parameters (tuple of name/value pairs), so unchanged elements are not
+    recomputed when another element is edited
+    '''
+    return getattr(StudyArea(p, etp), function)(**dict(params))
+
+
 # initalize water balance computations
-dict_elements = {}
-dict_elements['Gärten, Grünflächen (Garden / Green Area)'] = register_measure(StudyArea.garden)
-dict_elements['Versiegelte Fläche (Flat Area)'] = register_measure(StudyArea.flat_area)
-dict_elements['wassergebundene Decke (Gravel Cover)'] = register_measure(StudyArea.gravel_cover)
-dict_elements['Teildurchlässige Flächenbeläge (Permeable Surface)'] = register_measure(StudyArea.permeable_surface)
-dict_elements['Poren-/Sicherstreine, Schotter (Porous Surface)'] = register_measure(StudyArea.porous_surface)
-dict_elements['Rasengittersteine (Paver Stonegrid)'] = register_measure(StudyArea.paver_stonegrid)
-dict_elements['Steildach (Roof)']=register_measure(StudyArea.roof)
-dict_elements['Grünes Dach (Green Roof)']=register_measure(StudyArea.green_roof)
-dict_elements['Grünes Dach minimal (Green Roof Shallow)'] = register_measure(StudyArea.green_roof_shallow)
-dict_elements['Einstaudach (Storage Roof)'] = register_measure(StudyArea.storage_roof)
-
-dict_measures = {}
-dict_measures['Mulde (Infiltration Swale)'] = register_measure(StudyArea.infilt_swale)
-#dict_measures['Drainage (Entwässerung)'] = register_measure(StudyArea.drainage) # fix connection types
-dict_measures['Flächenversickerung (Surf infiltration)'] = register_measure(StudyArea.surf_infiltration)
-dict_measures['Mulde mit Rigole (Swale Trench)'] = register_measure(StudyArea.swale_trench)
-dict_measures['Mulden-Rigolen-System (Swale-Trench System)'] = register_measure(StudyArea.swale_trench_system)
-dict_measures['Regenwassernutzung (Rainwater Usage)'] = register_measure(StudyArea.rainwater_usage)
-dict_measures['Teich (Pond System)'] = register_measure(StudyArea.pond_system)
+dict_elements, dict_measures = register_elements()
 
 
 # Streamlit app
@@ -131,10 +155,10 @@ for i in range(0,num_objects):
         c.markdown('*Partitioning factors for natural reference state (see, www.naturwb.de):*')
     # Initialize data_list with default params if not already done
     if len(st.session_state.data_list) <= i:
-        st.session_state.data_list.append(dict_elements[option].params)
+        st.session_state.data_list.append(dict_elements[option].params.copy())
     else:
         # Update the DataFrame with the selected option's params if the option changes
-        st.session_state.data_list[i] = dict_elements[option].params
+        st.session_state.data_list[i] = dict_elements[option].params.copy()
     
     update_data(i, option, c)
     c.checkbox('An Maßnahme anschließen? *Connect to Stormwater Management Measure?*', False, key=f'check{i}')
@@ -184,7 +208,8 @@ if st.button('Start'):
             if wb_check != 1.00:
                 raise ValueError('Auteilungswerte ergeben nicht 1.0 in der Summe! Total of partitioning factors is not equal 1.')
         
-        result = getattr(study_area, function_i)(**params_i.iloc[0])
+        result = element_result(in_precip, in_etp, function_i,
+                                tuple(params_i.iloc[0].items()))
         
         if st.session_state[f'check{i}']:
             list_connected.append(result)